@@ -0,0 +1,219 @@
+"""
+Columnar cache of parsed GRIT results for fast queries (see query_results.py).
+
+Each column is stored in its own file inside the cache directory so that a query only reads the
+columns it needs: numeric columns as raw doubles (NaN for missing values) and text columns as JSON
+lists.  Only the standard library is imported so that loading the cache starts quickly.
+"""
+
+import json
+import math
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+
+# numeric columns and the type used to display them (all other columns are stored as text)
+NUMERIC_COLUMNS = {
+    "place": "int",
+    "bib": "int",
+    "distance_miles": "float",
+    "elevation_gain_ft": "float",
+    "age": "int",
+    "pace_seconds": "int",
+    "race_id": "int",
+    "result_set_id": "int",
+    "participant_id": "int",
+}
+
+# column derived from "pace" when the cache is written so that runners can be ranked by pace
+DERIVED_COLUMNS = ["pace_seconds"]
+
+
+class ColumnarCacheWriter:
+    """
+    Collect parsed rows column by column and write them to a cache directory.
+    """
+
+    def __init__(self, column_names: list[str]):
+        """
+        Args:
+            column_names (list[str]): column name of each value in the rows that will be added
+                (e.g. get_column_names(include_keys))
+        """
+        self.column_names = list(column_names)
+        self.num_rows = 0
+        self._columns = {
+            column_name: array("d") if column_name in NUMERIC_COLUMNS else []
+            for column_name in self.column_names + DERIVED_COLUMNS
+        }
+        self._pace_pos = self.column_names.index("pace") if "pace" in self.column_names else None
+
+    def add_row(self, row: Iterable[Union[None, str, int, float]]) -> None:
+        """
+        Add a single row (e.g. from iter_grit_file_rows or df.itertuples(index=False))
+
+        Args:
+            row (Iterable[Union[None, str, int, float]]): one value per column name
+        """
+        # imported here so that reading the cache never imports parsing (and lxml)
+        from parsing import is_missing
+
+        row = list(row)
+        if len(row) != len(self.column_names):
+            raise ValueError(f"Expected the row to have {len(self.column_names)} values")
+
+        for column_name, value in zip(self.column_names, row):
+            column = self._columns[column_name]
+            if column_name in NUMERIC_COLUMNS:
+                column.append(math.nan if is_missing(value) else float(value))
+            else:
+                column.append(None if is_missing(value) else str(value))
+
+        pace = None if self._pace_pos is None else row[self._pace_pos]
+        self._columns["pace_seconds"].append(_pace_to_seconds(pace))
+        self.num_rows += 1
+
+    def add_rows(
+        self, rows: Iterable[Iterable[Union[None, str, int, float]]]
+    ) -> Iterator[Iterable[Union[None, str, int, float]]]:
+        """
+        Add rows as they pass through (so that the cache can be built while the rows are streamed to
+        another consumer such as write_grit_csv)
+
+        Args:
+            rows (Iterable[Iterable[Union[None, str, int, float]]]): rows
+
+        Yields:
+            Iterator[Iterable[Union[None, str, int, float]]]: the unchanged rows
+        """
+        for row in rows:
+            self.add_row(row)
+            yield row
+
+    def save(self, cache_dir: Union[str, Path]) -> None:
+        """
+        Write one file per column and a manifest to the cache directory
+
+        Args:
+            cache_dir (Union[str, Path]): cache directory (created if needed)
+        """
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = {"version": CACHE_FORMAT_VERSION, "num_rows": self.num_rows, "columns": {}}
+        for column_name, column in self._columns.items():
+            if column_name in NUMERIC_COLUMNS:
+                file_name = f"{column_name}.f8"
+                with open(cache_dir / file_name, "wb") as out_file:
+                    column.tofile(out_file)
+                column_type = NUMERIC_COLUMNS[column_name]
+            else:
+                file_name = f"{column_name}.json"
+                with open(cache_dir / file_name, "w") as out_file:
+                    json.dump(column, out_file)
+                column_type = "str"
+            manifest["columns"][column_name] = {"type": column_type, "file": file_name}
+
+        # write the manifest last so that a partially written cache is never loaded
+        with open(cache_dir / MANIFEST_FILE_NAME, "w") as out_file:
+            json.dump(manifest, out_file, indent=4)
+
+
+def _pace_to_seconds(pace: Union[None, str]) -> float:
+    """
+    Convert pace text to seconds (NaN if missing or malformed)
+    """
+    # imported here so that reading the cache never imports parsing (and lxml)
+    from parsing import is_missing, time_text_to_seconds
+
+    if is_missing(pace):
+        return math.nan
+    try:
+        return float(time_text_to_seconds(pace))
+    except ValueError:
+        return math.nan
+
+
+class ColumnarCache:
+    """
+    Read-only access to a cache directory that loads each column on first use.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        """
+        Args:
+            cache_dir (Union[str, Path]): cache directory written by ColumnarCacheWriter.save
+
+        Raises:
+            ValueError: cache does not exist or has an unsupported format version
+        """
+        self.cache_dir = Path(cache_dir)
+        manifest_file_path = self.cache_dir / MANIFEST_FILE_NAME
+        if not manifest_file_path.is_file():
+            raise ValueError(f"cache does not exist: {self.cache_dir}")
+        with open(manifest_file_path, "r") as in_file:
+            manifest = json.load(in_file)
+        if manifest.get("version") != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version ({manifest.get('version')})")
+
+        self.num_rows = manifest["num_rows"]
+        self.column_types = {
+            column_name: d["type"] for column_name, d in manifest["columns"].items()
+        }
+        self._files = {column_name: d["file"] for column_name, d in manifest["columns"].items()}
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, column_name: str) -> Union[array, list[Union[None, str]]]:
+        """
+        Return a column, reading it from disk on first access
+
+        Args:
+            column_name (str): column name
+
+        Raises:
+            KeyError: column_name is not in the cache
+            ValueError: column file does not have one value per row
+
+        Returns:
+            Union[array, list[Union[None, str]]]: doubles (NaN if missing) or text (None if missing)
+        """
+        if column_name not in self._columns:
+            file_path = self.cache_dir / self._files[column_name]
+            if self.column_types[column_name] == "str":
+                with open(file_path, "r") as in_file:
+                    column = json.load(in_file)
+            else:
+                column = array("d")
+                with open(file_path, "rb") as in_file:
+                    column.frombytes(in_file.read())
+            if len(column) != self.num_rows:
+                raise ValueError(f"cache column {column_name} does not have one value per row")
+            self._columns[column_name] = column
+        return self._columns[column_name]
+
+    def format_value(self, column_name: str, pos: int) -> str:
+        """
+        Format a single value for display ("" if missing)
+
+        Args:
+            column_name (str): column name
+            pos (int): row position
+
+        Returns:
+            str: value
+        """
+        value = self[column_name][pos]
+        column_type = self.column_types[column_name]
+        if column_type == "str":
+            return "" if value is None else value
+        if math.isnan(value):
+            return ""
+        if column_type == "int":
+            return str(int(value))
+        return str(value)
@@ -0,0 +1,74 @@
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from crews import CrewStandings
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Raises:
+        ValueError: if input file does not exist
+
+    Returns:
+        argparse.Namespace: args contains input_file_path, state_file_path and num_crews
+    """
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        dest="input_file_path",
+        type=str,
+        required=True,
+        help="CSV input file path (latest snapshot written by parse_results.py)",
+    )
+    parser.add_argument(
+        "--state",
+        "-s",
+        dest="state_file_path",
+        type=str,
+        default=None,
+        help="standings state file path (updated incrementally if it exists, created otherwise)",
+    )
+    parser.add_argument(
+        "-n",
+        dest="num_crews",
+        type=int,
+        default=20,
+        help="number of crews to show",
+    )
+
+    args = parser.parse_args()
+    if not os.path.isfile(args.input_file_path):
+        raise ValueError(f"input_file_path does not exist: {args.input_file_path}")
+
+    return args
+
+
+def main():
+    args = parse_args()
+    input_file_path = Path(args.input_file_path)
+
+    df = pd.read_csv(input_file_path)
+
+    # refresh the standings from the saved state (only changed members are re-aggregated)
+    if args.state_file_path is not None and os.path.isfile(args.state_file_path):
+        standings = CrewStandings.load(args.state_file_path)
+        num_changed = standings.update(df)
+        print(f"re-aggregated {num_changed} changed crew members")
+    else:
+        standings = CrewStandings.from_snapshot(df)
+
+    if args.state_file_path is not None:
+        standings.save(args.state_file_path)
+
+    print(standings.standings().head(args.num_crews).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
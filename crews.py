@@ -0,0 +1,239 @@
+"""
+Run crew (team) standings computed from parsed GRIT results.
+
+Standings are computed in one vectorized group pass and can then be refreshed incrementally from new
+snapshots: only the members whose crew, distance or elevation changed are re-aggregated.  Each
+contribution is rounded to the precision of the results (thousandths of a mile and whole feet) and
+totals are kept as integers, so that any sequence of updates gives exactly the same standings as a
+full recompute.
+"""
+
+import json
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from snapshots import frame_from_state, frame_to_state, get_changed_keys, index_by_bib
+
+# columns of a member's contribution to their crew's standing
+MEMBER_COLUMNS = ["run_crew_name", "distance_miles", "elevation_gain_ft"]
+
+# distances are rounded to and summed in integer thousandths of a mile
+MILES_SCALE = 1000
+
+# running totals kept for each crew (counts of non-missing values are needed for exact means)
+TOTAL_COLUMNS = [
+    "member_count",
+    "total_miles_thousandths",
+    "miles_count",
+    "total_elevation_ft",
+    "elevation_count",
+]
+
+STANDINGS_COLUMNS = [
+    "run_crew_name",
+    "member_count",
+    "total_miles",
+    "mean_miles",
+    "total_elevation_ft",
+    "mean_elevation_ft",
+]
+
+
+def get_members(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return each crew member's contribution indexed by bib (runners without a crew are dropped)
+
+    Args:
+        df (pd.DataFrame): parsed results (parse_grit_html output or the CSV written from it)
+
+    Raises:
+        ValueError: a bib appears more than once
+
+    Returns:
+        pd.DataFrame: members with MEMBER_COLUMNS indexed by bib
+    """
+    members = index_by_bib(df, MEMBER_COLUMNS)
+    members = members[members["run_crew_name"].notna()].copy()
+    members[["distance_miles", "elevation_gain_ft"]] = members[
+        ["distance_miles", "elevation_gain_ft"]
+    ].astype(float)
+    return members
+
+
+def to_integer_units(values: pd.Series, scale: int) -> pd.Series:
+    """
+    Round values to the nearest integer number of 1 / scale units (missing values are kept)
+
+    Args:
+        values (pd.Series): float values
+        scale (int): number of units per value of 1.0
+
+    Returns:
+        pd.Series: nullable integer values
+    """
+    return (values * scale).round().astype("Int64")
+
+
+def aggregate_members(members: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sum the contributions of members in a single group pass
+
+    Distances are rounded to thousandths of a mile and elevation gains to whole feet before summing.
+
+    Args:
+        members (pd.DataFrame): members with MEMBER_COLUMNS
+
+    Returns:
+        pd.DataFrame: TOTAL_COLUMNS (all integers) indexed by run_crew_name
+    """
+    members = members.assign(
+        distance_miles=to_integer_units(members["distance_miles"], MILES_SCALE),
+        elevation_gain_ft=to_integer_units(members["elevation_gain_ft"], 1),
+    )
+    totals = members.groupby("run_crew_name").agg(
+        member_count=("run_crew_name", "size"),
+        total_miles_thousandths=("distance_miles", "sum"),
+        miles_count=("distance_miles", "count"),
+        total_elevation_ft=("elevation_gain_ft", "sum"),
+        elevation_count=("elevation_gain_ft", "count"),
+    )
+    return totals.reindex(columns=TOTAL_COLUMNS).astype(np.int64)
+
+
+def totals_to_standings(totals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert crew totals to standings sorted by total miles
+
+    Args:
+        totals (pd.DataFrame): TOTAL_COLUMNS indexed by run_crew_name
+
+    Returns:
+        pd.DataFrame: standings with STANDINGS_COLUMNS
+    """
+    standings = totals.copy()
+    standings["total_miles"] = standings["total_miles_thousandths"] / MILES_SCALE
+    standings["total_elevation_ft"] = standings["total_elevation_ft"].astype(float)
+    standings["mean_miles"] = standings["total_miles"] / standings["miles_count"]
+    standings["mean_elevation_ft"] = standings["total_elevation_ft"] / standings["elevation_count"]
+    standings = standings.rename_axis("run_crew_name").reset_index()
+    standings = standings.sort_values(
+        ["total_miles", "run_crew_name"], ascending=[False, True], ignore_index=True
+    )
+    return standings[STANDINGS_COLUMNS]
+
+
+def compute_crew_standings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute run crew standings (member count, total and mean miles and elevation gain per crew)
+
+    Args:
+        df (pd.DataFrame): parsed results (parse_grit_html output or the CSV written from it)
+
+    Returns:
+        pd.DataFrame: standings with STANDINGS_COLUMNS sorted by total miles
+    """
+    return totals_to_standings(aggregate_members(get_members(df)))
+
+
+class CrewStandings:
+    """
+    Crew standings that are updated incrementally from new snapshots of the results.
+
+    The contribution of every crew member and the running totals of every crew are kept.  On
+    update, the new snapshot is compared with the stored contributions and only the members that
+    were added, removed or changed are re-aggregated and applied to the totals.
+    """
+
+    def __init__(self, members: pd.DataFrame, totals: pd.DataFrame):
+        """
+        Args:
+            members (pd.DataFrame): members with MEMBER_COLUMNS indexed by bib
+            totals (pd.DataFrame): TOTAL_COLUMNS indexed by run_crew_name
+        """
+        self.members = members
+        self.totals = totals
+
+    @classmethod
+    def from_snapshot(cls, df: pd.DataFrame) -> "CrewStandings":
+        """
+        Compute standings from scratch
+
+        Args:
+            df (pd.DataFrame): parsed results
+
+        Returns:
+            CrewStandings: standings
+        """
+        members = get_members(df)
+        return cls(members, aggregate_members(members))
+
+    def standings(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: standings with STANDINGS_COLUMNS sorted by total miles
+        """
+        return totals_to_standings(self.totals)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Update the standings from a new snapshot of the results
+
+        Args:
+            df (pd.DataFrame): parsed results
+
+        Returns:
+            int: number of members that were re-aggregated
+        """
+        new_members = get_members(df)
+        old_members = self.members
+
+        changed = get_changed_keys(old_members, new_members)
+        if len(changed) == 0:
+            return 0
+
+        # remove the old contributions and add the new ones (missing rows contribute nothing)
+        removed = aggregate_members(old_members.reindex(changed).dropna(subset=["run_crew_name"]))
+        added = aggregate_members(new_members.reindex(changed).dropna(subset=["run_crew_name"]))
+        totals = self.totals.sub(removed, fill_value=0).add(added, fill_value=0)
+        totals = totals[totals["member_count"] > 0]
+        self.totals = totals.astype(np.int64).sort_index()
+        self.members = new_members
+
+        return len(changed)
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        """
+        Save the members and totals so that standings can be refreshed across runs
+
+        Args:
+            file_path (Union[str, Path]): JSON output file path
+        """
+        state = {
+            "members": frame_to_state(self.members),
+            "totals": frame_to_state(self.totals),
+        }
+        with open(file_path, "w") as out_file:
+            json.dump(state, out_file)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "CrewStandings":
+        """
+        Load standings saved with save()
+
+        Args:
+            file_path (Union[str, Path]): JSON input file path
+
+        Returns:
+            CrewStandings: standings
+        """
+        with open(file_path, "r") as in_file:
+            state = json.load(in_file)
+
+        members = frame_from_state(state["members"]).astype(
+            {"distance_miles": float, "elevation_gain_ft": float}
+        )
+        totals = frame_from_state(state["totals"]).astype(np.int64)
+        return cls(members, totals)
@@ -0,0 +1,280 @@
+"""
+Fast scanner for the runsignup results table markup.
+
+Instead of building an HTML tree, the raw text is walked once with a handful of precompiled regular
+expressions tuned to the exact markup saved from runsignup.com, and cell values are emitted
+directly.  Anything that does not look exactly as expected raises UnexpectedMarkupError, in which
+case parse_grit_rows_fast falls back to the lxml parsing path.  This includes text that libxml2
+rewrites while parsing (carriage returns become newlines, NUL characters become U+FFFD and numeric
+character references are decoded with its own rules), so the results are the same as
+parse_grit_table_body.
+"""
+
+import html
+import re
+from typing import Callable, Union
+
+from parsing import (
+    EXPECTED_HEADER,
+    find_grit_table_body,
+    get_handlers,
+    parse_elevation_gain_text,
+    parse_grit_table_body,
+    parse_result_url,
+)
+
+
+class UnexpectedMarkupError(ValueError):
+    """
+    Raised when the scanner finds markup it does not expect
+    """
+
+
+_WS = re.compile(r"\s*")
+_PREFIX = re.compile(r"\s*(?:<!DOCTYPE[^>]*>)?\s*(?:<html>)?\s*(?:<body>)?\s*", re.IGNORECASE)
+_ATTRS = r'(?:\s+[a-zA-Z-]+="[^"]*")*'
+_TABLE_START = re.compile(rf"<table{_ATTRS}\s*>")
+_TH_START = re.compile(rf"<th{_ATTRS}\s*>")
+_RESULT_URL = re.compile(r'\sdata-result-url="([^"]*)"')
+# named character references (decoded the same by html.unescape and lxml) or a lone '&' (numeric
+# references are not matched, e.g. html.unescape drops '&#1;' while lxml keeps '\x01')
+_ENTITY = re.compile(r"&(?:[a-zA-Z][a-zA-Z0-9]*;|(?![a-zA-Z0-9#]))")
+
+# characters that libxml2 rewrites in text (see the module docstring)
+_REWRITTEN_CHARACTERS = re.compile(r"[\r\0]")
+
+# cell holding only text (lxml ignores the '/' in '<td/>', which is empty as long as no text
+# follows it, and here the next thing matched is always another tag)
+_TEXT_CELL = rf"\s*<td{_ATTRS}\s*(?:>([^<]*)</td>|/>)"
+
+# <td class="ta-left"> holding the participantName structure (see participant_name_handler)
+_NAME_CELL = (
+    r'\s*<td class="ta-left">'
+    r'\s*<div class="participantName">'
+    r'\s*<div class="participantName__image">'
+    r"\s*<div[^<>]*>(?:<span>[^<]*</span>|<span/>)</div>"
+    r"\s*</div>"
+    r'\s*<div class="participantName__name">'
+    r'\s*<div class="participantName__name__firstName">([^<]*)</div>'
+    r'\s*<div class="participantName__name__lastName">([^<]*)</div>'
+    r"\s*</div>"
+    r"\s*</div>"
+    r"\s*</td>"
+)
+
+# run crew cell holding either text or a link to the team results (see run_crew_name_handler)
+_RUN_CREW_CELL = (
+    rf"\s*<td{_ATTRS}\s*"
+    rf"(?:>([^<]*)</td>|/>|><a{_ATTRS}\s*>([^<]*)(?:<i{_ATTRS}\s*/?>(?:</i>)?)?\s*</a>\s*</td>)"
+)
+
+# a complete table row in the exact markup saved from runsignup.com (one group per value)
+_ROW = re.compile(
+    rf"\s*<tr({_ATTRS})\s*>"
+    + _TEXT_CELL * 2  # place, bib
+    + _NAME_CELL  # name (first name, last name)
+    + _TEXT_CELL * 8  # gender, city, state, country, clock_time, chip_time, distance, progress
+    + _TEXT_CELL  # elevation_gain_ft
+    + _TEXT_CELL * 3  # pace, age, age_percentage
+    + _RUN_CREW_CELL  # run_crew_name
+    + r"\s*</tr>"
+)
+
+
+def _decode_text(s: Union[None, str]) -> Union[None, str]:
+    """
+    Decode the text of a node, matching lxml (missing or empty text is None)
+    """
+    if not s:
+        return None
+    if "&" not in s:
+        return s
+    if len(_ENTITY.findall(s)) != s.count("&"):
+        raise UnexpectedMarkupError(f"unexpected character reference in '{s}'")
+    return html.unescape(s)
+
+
+def _simple(dtype: type) -> Callable[[Union[None, str]], Union[None, int, float, str]]:
+    """
+    Value parser matching get_simple_value_handler(dtype)
+    """
+
+    def parse(s):
+        text = _decode_text(s)
+        if text is None:
+            return None
+        return dtype(text)
+
+    return parse
+
+
+def _elevation_gain(s: Union[None, str]) -> float:
+    """
+    Value parser matching elevation_gain_handler
+    """
+    text = _decode_text(s)
+    if text is None:
+        raise UnexpectedMarkupError("missing elevation gain")
+    return parse_elevation_gain_text(text)
+
+
+def _run_crew_name(text: Union[None, str], link_text: Union[None, str]) -> Union[None, str]:
+    """
+    Value parser matching run_crew_name_handler
+    """
+    if link_text is None:
+        return _decode_text(text)
+    link_text = _decode_text(link_text)
+    if link_text is None:
+        return None
+    return link_text.strip() or None
+
+
+# one value parser for each column except name and run_crew_name (see get_handlers)
+_VALUE_PARSERS_BEFORE_NAME = [
+    _simple(int),  # "place",
+    _simple(int),  # "bib",
+]
+_VALUE_PARSERS_AFTER_NAME = [
+    _simple(str),  # "gender",
+    _simple(str),  # "city",
+    _simple(str),  # "state",
+    _simple(str),  # "country",
+    _simple(str),  # "clock_time",
+    _simple(str),  # "chip_time",
+    _simple(float),  # "distance_miles",
+    _simple(str),  # "progress",
+    _elevation_gain,  # "elevation_gain_ft",
+    _simple(str),  # "pace",
+    _simple(int),  # "age",
+    _simple(str),  # "age_percentage",
+]
+
+
+def _expect(html_text: str, pos: int, literal: str) -> int:
+    """
+    Skip whitespace and the expected literal, returning the new position
+    """
+    pos = _WS.match(html_text, pos).end()
+    if not html_text.startswith(literal, pos):
+        raise UnexpectedMarkupError(f"expected '{literal}' at position {pos}")
+    return pos + len(literal)
+
+
+def _scan_header(html_text: str, pos: int) -> tuple[list[str], int]:
+    """
+    Scan the header row returning the column names (text before any child node) and new position
+    """
+    pos = _expect(html_text, pos, "<thead>")
+    pos = _expect(html_text, pos, "<tr>")
+    header = []
+    while True:
+        pos = _WS.match(html_text, pos).end()
+        if html_text.startswith("</tr>", pos):
+            break
+        match = _TH_START.match(html_text, pos)
+        if match is None:
+            raise UnexpectedMarkupError(f"expected '<th>' at position {pos}")
+        end = html_text.find("</th>", match.end())
+        if end == -1:
+            raise UnexpectedMarkupError("missing '</th>'")
+        content = html_text[match.end() : end]
+        n = content.find("<")
+        header.append(_decode_text(content if n == -1 else content[:n]))
+        pos = end + len("</th>")
+    pos = _expect(html_text, pos, "</tr>")
+    pos = _expect(html_text, pos, "</thead>")
+    return header, pos
+
+
+def _scan_row(html_text: str, pos: int, include_keys: bool) -> tuple[list, int]:
+    """
+    Scan a single table row returning the row and new position
+    """
+    match = _ROW.match(html_text, pos)
+    if match is None:
+        raise UnexpectedMarkupError(f"expected a table row at position {pos}")
+    groups = match.groups()
+
+    place, bib = (parse(s) for parse, s in zip(_VALUE_PARSERS_BEFORE_NAME, groups[1:3]))
+    row = [place, bib, f"{_decode_text(groups[3])} {_decode_text(groups[4])}"]
+    row.extend(parse(s) for parse, s in zip(_VALUE_PARSERS_AFTER_NAME, groups[5:-2]))
+    row.append(_run_crew_name(*groups[-2:]))
+
+    if include_keys:
+        url_match = _RESULT_URL.search(groups[0])
+        result_url = None if url_match is None else _decode_text(url_match.group(1))
+        row.extend(parse_result_url(result_url))
+    return row, match.end()
+
+
+def scan_grit_rows(
+    html_text: str, include_keys: bool = False
+) -> list[list[Union[None, str, int, float]]]:
+    """
+    Scan the raw GRIT HTML text and return the parsed rows without building an HTML tree
+
+    Args:
+        html_text (str): input HTML text to parse
+        include_keys (bool, optional): append KEY_COLUMNS values to each row. Defaults to False.
+
+    Raises:
+        UnexpectedMarkupError: markup is not exactly as expected
+        ValueError: header does not match what was expected
+
+    Returns:
+        list[list[Union[None, str, int, float]]]: data
+    """
+    if _REWRITTEN_CHARACTERS.search(html_text) is not None:
+        raise UnexpectedMarkupError("text contains a carriage return or NUL character")
+
+    pos = _PREFIX.match(html_text).end()
+    match = _TABLE_START.match(html_text, pos)
+    if match is None:
+        raise UnexpectedMarkupError("expected '<table>' at the start of the document")
+
+    header, pos = _scan_header(html_text, match.end())
+    if header != EXPECTED_HEADER:
+        raise UnexpectedMarkupError("header does not match what was expected")
+
+    pos = _expect(html_text, pos, "<tbody>")
+    data = []
+    while True:
+        pos = _WS.match(html_text, pos).end()
+        if html_text.startswith("</tbody>", pos):
+            break
+        row, pos = _scan_row(html_text, pos, include_keys)
+        data.append(row)
+    if len(data) < 1:
+        raise UnexpectedMarkupError("Expected table_body to have one or more children")
+
+    return data
+
+
+def parse_grit_rows_fast(
+    html_text: str, include_keys: bool = False, defects: list[tuple] = None
+) -> list[list[Union[None, str, int, float]]]:
+    """
+    Parse the GRIT HTML text with the fast scanner, falling back to lxml on unexpected markup
+
+    The scanner only succeeds when every value is valid, so bad values are always handled (and
+    recorded in defects) by the lxml path.
+
+    Args:
+        html_text (str): input HTML text to parse
+        include_keys (bool, optional): append KEY_COLUMNS values to each row. Defaults to False.
+        defects (list[tuple], optional): parse leniently, appending bad values to this list (see
+            parse_grit_table_row). Defaults to None (raise).
+
+    Raises:
+        ValueError: header does not match what was expected or the table is not formatted as
+            expected (raised by the lxml path)
+
+    Returns:
+        list[list[Union[None, str, int, float]]]: data
+    """
+    try:
+        return scan_grit_rows(html_text, include_keys)
+    except ValueError:
+        table_body = find_grit_table_body(html_text)
+        return parse_grit_table_body(table_body, get_handlers(), include_keys, defects)
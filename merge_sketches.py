@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+from sketches import merge_sketch_files
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Raises:
+        ValueError: if an input file does not exist
+
+    Returns:
+        argparse.Namespace: args contains input_file_paths and output_file_path
+    """
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        dest="input_file_paths",
+        type=str,
+        nargs="+",
+        required=True,
+        help="sketch input file paths (*.sketch.json written by parse_results.py --sketch)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        dest="output_file_path",
+        type=str,
+        default=None,
+        help="merged sketch output file path (optional)",
+    )
+
+    args = parser.parse_args()
+    for input_file_path in args.input_file_paths:
+        if not os.path.isfile(input_file_path):
+            raise ValueError(f"input_file_path does not exist: {input_file_path}")
+
+    return args
+
+
+def main():
+    args = parse_args()
+
+    sketch = merge_sketch_files(Path(p) for p in args.input_file_paths)
+
+    # print summary statistics for the merged sketches
+    print(json.dumps(sketch.describe(), indent=4))
+
+    if args.output_file_path is not None:
+        sketch.save(Path(args.output_file_path))
+
+
+if __name__ == "__main__":
+    main()
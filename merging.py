@@ -0,0 +1,119 @@
+"""
+Merge several partial exports (e.g. page files) of the same result set in a single streaming pass.
+"""
+
+from typing import Iterable, Iterator, Union
+
+from parsing import KEY_COLUMNS, REFORMATTED_HEADER
+
+PLACE_POS = REFORMATTED_HEADER.index("place")
+BIB_POS = REFORMATTED_HEADER.index("bib")
+KEY_POS = [len(REFORMATTED_HEADER) + i for i in range(len(KEY_COLUMNS))]
+
+
+def get_row_key(row: list[Union[None, str, int, float]]) -> tuple:
+    """
+    Return the deduplication key for a row parsed with include_keys=True
+
+    The participant id identifies the registering account (which can register more than one runner)
+    so it is combined with the bib.  Rows without a data-result-url fall back to the bib alone.
+
+    Args:
+        row (list[Union[None, str, int, float]]): row (one value per get_column_names(True) column)
+
+    Returns:
+        tuple: key
+    """
+    race_id, result_set_id, participant_id = (row[pos] for pos in KEY_POS)
+    if participant_id is None:
+        return ("bib", row[BIB_POS])
+    return (race_id, result_set_id, participant_id, row[BIB_POS])
+
+
+class RowMerger:
+    """
+    Deduplicate rows from several partial exports and check that places are contiguous.
+
+    Only the key, a hash of each kept row and the set of places are held in memory, so the cost is
+    linear in the total number of rows.
+    """
+
+    def __init__(self):
+        self.num_rows_read = 0
+        self.num_duplicates = 0
+        self.conflicts = []
+        self._row_hashes = {}
+        self._places = set()
+        self._result_set = None
+
+    def merge(
+        self, row_iters: Iterable[Iterable[list[Union[None, str, int, float]]]]
+    ) -> Iterator[list[Union[None, str, int, float]]]:
+        """
+        Yield each unique row once, in order of first appearance.
+
+        A row whose key was already seen is dropped.  If its values differ from the kept row, the
+        key is recorded in self.conflicts.
+
+        Args:
+            row_iters (Iterable[Iterable[list[Union[None, str, int, float]]]]): rows of each
+                partial export (parsed with include_keys=True)
+
+        Raises:
+            ValueError: rows come from different races or result sets
+
+        Yields:
+            Iterator[list[Union[None, str, int, float]]]: unique rows
+        """
+        for rows in row_iters:
+            for row in rows:
+                self.num_rows_read += 1
+                self._check_result_set(row)
+
+                key = get_row_key(row)
+                row_hash = hash(tuple(row))
+                if key in self._row_hashes:
+                    self.num_duplicates += 1
+                    if self._row_hashes[key] != row_hash:
+                        self.conflicts.append(key)
+                    continue
+                self._row_hashes[key] = row_hash
+
+                if row[PLACE_POS] is not None:
+                    self._places.add(row[PLACE_POS])
+                yield row
+
+    def _check_result_set(self, row: list[Union[None, str, int, float]]) -> None:
+        race_id, result_set_id, participant_id = (row[pos] for pos in KEY_POS)
+        if participant_id is None:
+            return
+        if self._result_set is None:
+            self._result_set = (race_id, result_set_id)
+        elif self._result_set != (race_id, result_set_id):
+            raise ValueError(
+                f"rows are from different result sets ({self._result_set} and "
+                f"{(race_id, result_set_id)}).  Are you merging exports of the same results?"
+            )
+
+    @property
+    def num_rows_kept(self) -> int:
+        return len(self._row_hashes)
+
+    def get_place_gaps(self) -> list[tuple[int, int]]:
+        """
+        Return the ranges of places that are missing between 1 and the largest place seen
+
+        Returns:
+            list[tuple[int, int]]: inclusive (first, last) place of each gap
+        """
+        gaps = []
+        gap_start = None
+        for place in range(1, max(self._places, default=0) + 1):
+            if place not in self._places:
+                if gap_start is None:
+                    gap_start = place
+            elif gap_start is not None:
+                gaps.append((gap_start, place - 1))
+                gap_start = None
+        # NOTE: the largest place seen is never part of a gap
+        return gaps
@@ -1,8 +1,23 @@
 import argparse
 import os
+import sys
 from pathlib import Path
+from typing import Iterator, Union
 
-from parsing import parse_grit_html
+from columnar_cache import ColumnarCacheWriter
+from merging import RowMerger
+from parsing import (
+    DEFECT_COLUMNS,
+    ENGINES,
+    REFORMATTED_HEADER,
+    get_column_names,
+    iter_grit_file_rows,
+    write_grit_csv,
+)
+from sketches import ResultsSketch, get_sketch_file_path
+
+# columns compared by the consistency pass when writing a defect report
+CHECKED_COLUMNS = ["clock_time", "distance_miles", "pace"]
 
 
 def parse_args() -> argparse.Namespace:
@@ -10,20 +25,21 @@ def parse_args() -> argparse.Namespace:
     Parse command line arguments.
 
     Raises:
-        ValueError: if input file does not exist
+        ValueError: if an input file does not exist
 
     Returns:
-        argparse.Namespace: args contains input_file_path and output_file_path
+        argparse.Namespace: args contains input_file_paths and output_file_path
     """
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
         "--input",
         "-i",
-        dest="input_file_path",
+        dest="input_file_paths",
         type=str,
+        nargs="+",
         required=True,
-        help="HTML input file path",
+        help="HTML input file path (give several partial exports of the same results to merge them)",
     )
     parser.add_argument(
         "--output",
@@ -33,27 +49,158 @@ def parse_args() -> argparse.Namespace:
         required=True,
         help="CSV output file path",
     )
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        type=str,
+        choices=ENGINES,
+        default="lxml",
+        help="parsing engine: 'fast' scans the raw runsignup markup (falling back to lxml on "
+        "unexpected markup), 'lxml' parses the HTML incrementally with little memory",
+    )
+    parser.add_argument(
+        "--keys",
+        dest="include_keys",
+        action="store_true",
+        help="add integer race_id, result_set_id and participant_id columns (from data-result-url)",
+    )
+    parser.add_argument(
+        "--sketch",
+        dest="write_sketch",
+        action="store_true",
+        help="also save mergeable distribution sketches next to the CSV output (*.sketch.json)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        dest="cache_dir",
+        type=str,
+        default=None,
+        help="also write a columnar cache to this directory for query_results.py",
+    )
+    parser.add_argument(
+        "--defects",
+        dest="defects_file_path",
+        type=str,
+        default=None,
+        help="parse leniently (bad values are left empty) and write every defect to this CSV file",
+    )
 
     args = parser.parse_args()
-    if not os.path.isfile(args.input_file_path):
-        raise ValueError(f"input_file_path does not exist: {args.input_file_path}")
+    for input_file_path in args.input_file_paths:
+        if not os.path.isfile(input_file_path):
+            raise ValueError(f"input_file_path does not exist: {input_file_path}")
 
     return args
 
 
 def main():
     args = parse_args()
-    input_file_path = Path(args.input_file_path)
+    input_file_paths = [Path(p) for p in args.input_file_paths]
     output_file_path = Path(args.output_file_path)
 
-    # read html file
-    with open(input_file_path, "r") as input_file:
-        html_text = input_file.read()
+    # parse the html file(s) and stream rows to the output CSV file (pandas is never imported unless
+    # a defect report is written)
+    # NOTE: partial exports can overlap, so they are deduplicated on the integer keys
+    merging = len(input_file_paths) > 1
+    include_keys = args.include_keys or merging
+    if args.defects_file_path is None:
+        defects = None
+        file_rows = [
+            iter_grit_file_rows(p, include_keys=include_keys, engine=args.engine)
+            for p in input_file_paths
+        ]
+    else:
+        defects = []
+        file_rows = [
+            iter_checked_rows(p, include_keys=include_keys, engine=args.engine, defects=defects)
+            for p in input_file_paths
+        ]
+
+    merger = None
+    if not merging:
+        rows = file_rows[0]
+    else:
+        merger = RowMerger()
+        rows = merger.merge(file_rows)
+        if not args.include_keys:
+            rows = (row[: len(REFORMATTED_HEADER)] for row in rows)
+
+    if args.write_sketch:
+        sketch = ResultsSketch()
+        rows = sketch.add_rows(rows)
+    if args.cache_dir is not None:
+        cache_writer = ColumnarCacheWriter(get_column_names(args.include_keys))
+        rows = cache_writer.add_rows(rows)
+    write_grit_csv(rows, output_file_path, get_column_names(args.include_keys))
+
+    if args.cache_dir is not None:
+        cache_writer.save(Path(args.cache_dir))
 
-    df = parse_grit_html(html_text)
+    if args.write_sketch:
+        sketch.save(get_sketch_file_path(output_file_path))
 
-    # write output CSV file
-    df.to_csv(output_file_path, header=True, index=False)
+    if merger is not None:
+        report_merge(merger, len(input_file_paths))
+
+    if defects is not None:
+        write_grit_csv(defects, Path(args.defects_file_path), ["input_file"] + DEFECT_COLUMNS)
+        print(f"found {len(defects)} defects (see {args.defects_file_path})", file=sys.stderr)
+
+
+def iter_checked_rows(
+    input_file_path: Path, include_keys: bool, engine: str, defects: list[tuple]
+) -> Iterator[list[Union[None, str, int, float]]]:
+    """
+    Parse a file leniently, then run the pace consistency pass once all of its rows have been read
+
+    Args:
+        input_file_path (Path): HTML input file path
+        include_keys (bool): append KEY_COLUMNS values to each row
+        engine (str): one of ENGINES
+        defects (list[tuple]): list to append (input_file, row, column, raw_text, reason) tuples to
+            (row is the position in the input file)
+
+    Yields:
+        Iterator[list[Union[None, str, int, float]]]: row
+    """
+    # imported here since the vectorized consistency pass needs pandas
+    import pandas as pd
+
+    from validation import check_pace_consistency
+
+    file_defects = []
+    checked_positions = [REFORMATTED_HEADER.index(column_name) for column_name in CHECKED_COLUMNS]
+    checked_values = []
+    for row in iter_grit_file_rows(input_file_path, include_keys, engine, file_defects):
+        checked_values.append([row[pos] for pos in checked_positions])
+        yield row
+
+    file_defects.extend(
+        check_pace_consistency(pd.DataFrame(checked_values, columns=CHECKED_COLUMNS))
+    )
+    file_defects.sort(key=lambda defect: defect[0])
+    defects.extend((str(input_file_path),) + defect for defect in file_defects)
+
+
+def report_merge(merger: RowMerger, num_files: int) -> None:
+    """
+    Print a summary of the merge (duplicates, conflicting duplicates and place gaps) to stderr
+
+    Args:
+        merger (RowMerger): merger after all rows have been consumed
+        num_files (int): number of input files
+    """
+    print(
+        f"merged {merger.num_rows_read} rows from {num_files} files into {merger.num_rows_kept} "
+        f"rows ({merger.num_duplicates} duplicates dropped)",
+        file=sys.stderr,
+    )
+    for key in merger.conflicts:
+        print(f"WARNING: duplicate rows with key {key} differ (kept the first)", file=sys.stderr)
+    for first, last in merger.get_place_gaps():
+        gap = str(first) if first == last else f"{first}-{last}"
+        print(f"WARNING: missing place(s) {gap}", file=sys.stderr)
 
 
 if __name__ == "__main__":
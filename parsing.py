@@ -2,12 +2,18 @@
 Collection of functions to parse GRIT HTML files.
 """
 
+import csv
+import os
 from pathlib import Path
-from typing import Callable, Union
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Union
+from urllib.parse import parse_qs, urlsplit
 
-import pandas as pd
 from lxml import etree
 
+if TYPE_CHECKING:
+    # pandas is imported lazily (see parse_grit_html) so that the streaming CSV path starts fast
+    import pandas as pd
+
 # column names expected when parsing HTML
 EXPECTED_HEADER = [
     "Place",
@@ -48,6 +54,25 @@ REFORMATTED_HEADER = [
     "run_crew_name",
 ]
 
+# parsing engines: "lxml" builds (or incrementally parses) an HTML tree, "fast" uses the scanner in
+# fast_scanner.py tuned to the runsignup markup (falling back to lxml on unexpected markup)
+ENGINES = ["lxml", "fast"]
+
+# integer key columns extracted from each row's data-result-url attribute
+KEY_COLUMNS = [
+    "race_id",
+    "result_set_id",
+    "participant_id",
+]
+
+# columns of the defects collected when parsing leniently (see parse_grit_table_row)
+DEFECT_COLUMNS = [
+    "row",
+    "column",
+    "raw_text",
+    "reason",
+]
+
 
 def get_simple_value_handler(
     dtype: type,
@@ -105,7 +130,7 @@ def participant_name_handler(node: etree._Element) -> str:
 
     # <td class="ta-left">
     if node.tag != "td":
-        raise ValueError()
+        raise ValueError(f"Expected node tag 'td', but got {node.tag}")
     if node.values() != ["ta-left"]:
         raise ValueError(f"Expected node value 'ta-left', but got {node.values()}")
     if len(node) != 1:
@@ -162,7 +187,50 @@ def elevation_gain_handler(node: etree._Element) -> float:
     """
     # Example:
     # <td>396ft (120.7m)</td>
-    s = node.text
+    if node.text is None:
+        raise ValueError("elevation gain is missing")
+    return parse_elevation_gain_text(node.text)
+
+
+def run_crew_name_handler(node: etree._Element) -> Union[None, str]:
+    """
+    Process HTML node to get the run crew name
+
+    Args:
+        node (etree._Element): HTML node with the run crew name, which is usually a link to the team
+            results (e.g. '<td><a href="...">Ducks <i class="icon"/></a></td>')
+
+    Raises:
+        ValueError: node is not formatted as expected
+
+    Returns:
+        Union[None, str]: run crew name or None if the runner is not in a run crew
+    """
+    # Example:
+    # <td><a href="/Race/Results/90618/TeamResults/TeamDetails-28511-673418" target="_blank">
+    #     Adventures for the Cure <i class="icon icon-external-link" aria-hidden="true"/></a></td>
+    if len(node) == 0:
+        return node.text
+    if len(node) != 1 or node[0].tag != "a":
+        raise ValueError("Expected run crew name node to have a single child with tag 'a'")
+    if node[0].text is None:
+        return None
+    return node[0].text.strip() or None
+
+
+def parse_elevation_gain_text(s: str) -> float:
+    """
+    Parse elevation gain text to get elevation gain in feet
+
+    Args:
+        s (str): elevation gain text (e.g. "396ft (120.7m)")
+
+    Raises:
+        ValueError: elevation gain text is not formatted as expected
+
+    Returns:
+        float: elevation_ft
+    """
     n = s.find("ft")
     m = s.find("(")
     p = s.find("m)")
@@ -176,6 +244,124 @@ def elevation_gain_handler(node: etree._Element) -> float:
     return elevation_ft
 
 
+def time_text_to_seconds(s: str) -> int:
+    """
+    Convert a clock time or pace string to a number of seconds
+
+    Args:
+        s (str): time formatted as "M:SS" or "H:MM:SS" (e.g. "8:02" or "34:42:29")
+
+    Raises:
+        ValueError: time text is not formatted as expected
+
+    Returns:
+        int: seconds
+    """
+    parts = s.split(":")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        raise ValueError(f"time text is not formatted as expected ('{s}')")
+
+    seconds = 0
+    for part in parts:
+        seconds = 60 * seconds + int(part)
+    return seconds
+
+
+def parse_result_url(
+    result_url: Union[str, None],
+) -> tuple[Union[None, int], Union[None, int], Union[None, int]]:
+    """
+    Extract the integer race id, result set id and participant id from a row's data-result-url
+
+    Args:
+        result_url (Union[str, None]): URL (e.g.
+            "/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U89338374")
+
+    Raises:
+        ValueError: result URL is not formatted as expected
+
+    Returns:
+        tuple[Union[None, int], Union[None, int], Union[None, int]]: (race_id, result_set_id,
+            participant_id) e.g. (90618, 459362, 89338374) or all None if result_url is None
+    """
+    if result_url is None:
+        return None, None, None
+
+    url = urlsplit(result_url)
+    path_parts = url.path.split("/")
+    result_set_ids = parse_qs(url.query).get("resultSetId", [])
+    if (
+        len(path_parts) < 4
+        or path_parts[1:3] != ["Race", "Results"]
+        or not path_parts[3].isdigit()
+        or len(result_set_ids) != 1
+        or not result_set_ids[0].isdigit()
+        or not url.fragment.startswith("U")
+        or not url.fragment[1:].isdigit()
+    ):
+        raise ValueError(f"result URL is not formatted as expected ('{result_url}')")
+
+    return int(path_parts[3]), int(result_set_ids[0]), int(url.fragment[1:])
+
+
+def get_column_names(include_keys: bool = False) -> list[str]:
+    """
+    Return the output column names
+
+    Args:
+        include_keys (bool, optional): append KEY_COLUMNS. Defaults to False.
+
+    Returns:
+        list[str]: column names
+    """
+    if include_keys:
+        return REFORMATTED_HEADER + KEY_COLUMNS
+    return list(REFORMATTED_HEADER)
+
+
+def is_missing(value: Union[None, str, int, float]) -> bool:
+    """
+    Return whether a parsed value is missing (None, or NaN in a pandas dataframe)
+
+    Args:
+        value (Union[None, str, int, float]): value
+
+    Returns:
+        bool: True if the value is missing
+    """
+    # NOTE: value != value is True for NaN
+    return value is None or value != value
+
+
+def build_key_index(
+    keys: Iterable[tuple[Union[None, int], ...]],
+) -> dict[tuple[int, ...], list[int]]:
+    """
+    Build a hash index from integer keys to the positions of the rows with that key
+
+    NOTE: participant_id is the id of the registering account, so a single account that registers
+    more than one runner gives rows that share a participant_id.  Include "bib" in the keys when a
+    unique row key is needed.
+
+    Example:
+        index = build_key_index(zip(df["race_id"], df["result_set_id"], df["participant_id"]))
+        rows = df.iloc[index[(90618, 459362, 89338374)]]
+
+    Args:
+        keys (Iterable[tuple[Union[None, int], ...]]): key of each row in order
+
+    Returns:
+        dict[tuple[int, ...], list[int]]: index (rows with a missing key value are not indexed)
+    """
+    index = {}
+    for pos, key in enumerate(keys):
+        if any(is_missing(value) for value in key):
+            continue
+        key = tuple(int(value) for value in key)
+        index.setdefault(key, []).append(pos)
+    return index
+
+
 def get_handlers() -> list[Callable]:
     """
     Return a handler to process the data node from each column of the table
@@ -203,7 +389,7 @@ def get_handlers() -> list[Callable]:
         get_simple_value_handler(str),  # "pace",
         get_simple_value_handler(int),  # "age",
         get_simple_value_handler(str),  # "age_percentage",
-        get_simple_value_handler(str),  # "run_crew_name",
+        run_crew_name_handler,  # "run_crew_name",
     ]
 
     return handlers
@@ -232,8 +418,155 @@ def parse_grit_table_header(table_header: Union[etree._Element, None]) -> list[s
     return header
 
 
+def check_grit_table_body(table_body: Union[etree._Element, None]) -> None:
+    """
+    Check that the table body is a 'tbody' node with one or more rows
+
+    Args:
+        table_body (Union[etree._Element, None]): node to check (with tag == 'tbody')
+
+    Raises:
+        ValueError: node isn't formatted as expected
+    """
+    if table_body is None:
+        raise ValueError("table_body is None")
+    if table_body.tag != "tbody":
+        raise ValueError("table_body tag is expected to be 'tbody'")
+    if len(table_body) < 1:
+        raise ValueError("Expected table_body to have one or more children")
+
+
+def iter_grit_table_body(
+    table_body: Union[etree._Element, None],
+    handlers,
+    include_keys: bool = False,
+    defects: list[tuple] = None,
+) -> Iterator[list[Union[str, int, float]]]:
+    """
+    Parse the table body yielding one list of values per row.
+
+    Args:
+        table_body (Union[etree._Element, None]): node to parse (with tag == 'tbody')
+        handlers (_type_): list of functions equal to the number of columns that handle parsing each
+            data node
+        include_keys (bool, optional): append KEY_COLUMNS values to each row. Defaults to False.
+        defects (list[tuple], optional): parse leniently, appending bad values to this list (see
+            parse_grit_table_row). Defaults to None (raise).
+
+    Raises:
+        ValueError: node isn't formatted as expected
+
+    Yields:
+        Iterator[list[Union[str, int, float]]]: row
+    """
+    check_grit_table_body(table_body)
+
+    for row_index, row_node in enumerate(table_body):
+        yield parse_grit_table_row(row_node, handlers, include_keys, defects, row_index)
+
+
+def check_grit_table_row(row_node: etree._Element, num_columns: int) -> None:
+    """
+    Check that a table row has one data node per column
+
+    Args:
+        row_node (etree._Element): node to check (with tag == 'tr')
+        num_columns (int): expected number of data nodes
+
+    Raises:
+        ValueError: node isn't formatted as expected
+    """
+    if row_node.tag != "tr":
+        raise ValueError("Expected table_body child node to have the tag 'tr'")
+    if len(row_node) != num_columns:
+        raise ValueError(
+            f"Expected the row to have the same length as number of handlers ({num_columns})"
+        )
+    for data_node in row_node:
+        if data_node.tag != "td":
+            raise ValueError("Expected data_node to have the tag 'td'")
+
+
+def get_raw_text(node: etree._Element) -> str:
+    """
+    Return the text of a node and all of its children with whitespace collapsed (for defect reports)
+
+    Args:
+        node (etree._Element): node
+
+    Returns:
+        str: text
+    """
+    return " ".join("".join(node.itertext()).split())
+
+
+def parse_grit_table_row(
+    row_node: etree._Element,
+    handlers,
+    include_keys: bool = False,
+    defects: list[tuple] = None,
+    row_index: int = None,
+) -> list[Union[str, int, float]]:
+    """
+    Parse a single table row.
+
+    By default the first bad value raises.  When a defects list is given, parsing is lenient: each
+    bad value is recorded as a (row, column, raw_text, reason) tuple (see DEFECT_COLUMNS) and None
+    is used in its place.  A malformed row is recorded once (with column None) and all its values
+    are None.
+
+    Args:
+        row_node (etree._Element): node to parse (with tag == 'tr')
+        handlers (_type_): list of functions equal to the number of columns that handle parsing each
+            data node
+        include_keys (bool, optional): append KEY_COLUMNS values parsed from the row's
+            data-result-url attribute. Defaults to False.
+        defects (list[tuple], optional): list to append defects to. Defaults to None (raise).
+        row_index (int, optional): row index recorded with the defects. Defaults to None.
+
+    Raises:
+        ValueError: node isn't formatted as expected (only if defects is None)
+
+    Returns:
+        list[Union[str, int, float]]: row
+    """
+    try:
+        check_grit_table_row(row_node, len(handlers))
+    except ValueError as e:
+        if defects is None:
+            raise
+        defects.append((row_index, None, get_raw_text(row_node), str(e)))
+        row = [None] * len(handlers)
+    else:
+        row = []
+        for column_name, data_node, handler in zip(REFORMATTED_HEADER, row_node, handlers):
+            try:
+                value = handler(data_node)
+            except ValueError as e:
+                if defects is None:
+                    raise
+                defects.append((row_index, column_name, get_raw_text(data_node), str(e)))
+                value = None
+            row.append(value)
+
+    if include_keys:
+        result_url = row_node.get("data-result-url")
+        try:
+            keys = parse_result_url(result_url)
+        except ValueError as e:
+            if defects is None:
+                raise
+            defects.append((row_index, "data-result-url", result_url, str(e)))
+            keys = (None,) * len(KEY_COLUMNS)
+        row.extend(keys)
+    return row
+
+
 def parse_grit_table_body(
-    table_body: Union[etree._Element, None], handlers
+    table_body: Union[etree._Element, None],
+    handlers,
+    include_keys: bool = False,
+    defects: list[tuple] = None,
 ) -> list[list[Union[str, int, float]]]:
     """
     Parse the table body returning a list of lists with all of the data.
@@ -242,6 +575,9 @@ def parse_grit_table_body(
         table_body (Union[etree._Element, None]): node to parse (with tag == 'tbody')
         handlers (_type_): list of functions equal to the number of columns that handle parsing each
             data node
+        include_keys (bool, optional): append KEY_COLUMNS values to each row. Defaults to False.
+        defects (list[tuple], optional): parse leniently, appending bad values to this list (see
+            parse_grit_table_row). Defaults to None (raise).
 
     Raises:
         ValueError: node isn't formatted as expected
@@ -249,35 +585,226 @@ def parse_grit_table_body(
     Returns:
         list[list[str]]: data
     """
-    if table_body is None:
-        raise ValueError(f"table_body is None")
-    if table_body.tag != "tbody":
-        raise ValueError("table_body tag is expected to be 'tbody'")
-    if len(table_body) < 1:
+    return list(iter_grit_table_body(table_body, handlers, include_keys, defects))
+
+
+def iter_grit_file_rows(
+    input_file_path: Union[str, Path],
+    include_keys: bool = False,
+    engine: str = "lxml",
+    defects: list[tuple] = None,
+) -> Iterator[list[Union[str, int, float]]]:
+    """
+    Incrementally parse a GRIT HTML file, yielding one row at a time.
+
+    With the lxml engine the document is never fully built in memory: each row is parsed as soon as
+    its closing tag is read and then discarded.  The fast engine reads the whole file and scans the
+    raw text instead.
+
+    Args:
+        input_file_path (Union[str, Path]): HTML input file path
+        include_keys (bool, optional): append KEY_COLUMNS values to each row. Defaults to False.
+        engine (str, optional): one of ENGINES. Defaults to "lxml".
+        defects (list[tuple], optional): parse leniently, appending bad values to this list (see
+            parse_grit_table_row). Defaults to None (raise).
+
+    Raises:
+        ValueError: engine is not recognized, header does not match what was expected or the table
+            is not formatted as expected (only the header and table structure if defects is given)
+
+    Yields:
+        Iterator[list[Union[str, int, float]]]: row (one value per column in
+            get_column_names(include_keys))
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine ({engine}) must be one of {ENGINES}")
+    if engine == "fast":
+        from fast_scanner import parse_grit_rows_fast
+
+        with open(input_file_path, "r", encoding="utf-8") as input_file:
+            html_text = input_file.read()
+        yield from parse_grit_rows_fast(html_text, include_keys, defects)
+        return
+
+    handlers = get_handlers()
+    header_checked = False
+    num_rows = 0
+
+    # NOTE: the saved table has no <meta charset>, so without an encoding libxml2 decodes the UTF-8
+    # bytes as Latin-1 (e.g. "José" would become "JosÃ©")
+    events = etree.iterparse(
+        str(input_file_path), events=("end",), tag=("thead", "tr"), html=True, encoding="utf-8"
+    )
+    for _, node in events:
+        parent = node.getparent()
+        if node.tag == "thead":
+            if parent is None or parent.tag != "table":
+                raise ValueError("table_header is expected to be a child of 'table'")
+            table_column_names = parse_grit_table_header(node)
+            if table_column_names != EXPECTED_HEADER:
+                raise ValueError(
+                    "header does not match what was expected.  Are you parsing the correct file?"
+                )
+            header_checked = True
+            continue
+
+        # rows in the header are checked when the closing thead tag is reached
+        if parent is None or parent.tag != "tbody":
+            continue
+        if not header_checked:
+            raise ValueError("table_header is None")
+
+        yield parse_grit_table_row(node, handlers, include_keys, defects, num_rows)
+        num_rows += 1
+
+        # free rows that have already been processed
+        node.clear()
+        while node.getprevious() is not None:
+            del parent[0]
+
+    if not header_checked:
+        raise ValueError("table_header is None")
+    if num_rows < 1:
         raise ValueError("Expected table_body to have one or more children")
 
-    data = []
-    for row_node in table_body:
-        if row_node.tag != "tr":
-            raise ValueError("Expected table_body child node to have the tag 'tr'")
-        if len(row_node) != len(handlers):
-            raise ValueError(
-                f"Expected the row to have the same length as number of handlers ({len(handlers)})"
-            )
 
-        row = []
-        for data_node, handler in zip(row_node, handlers):
-            if data_node.tag != "td":
-                raise ValueError("Expected data_node to have the tag 'td'")
-            row.append(handler(data_node))
-        data.append(row)
+def write_grit_csv(
+    rows: Iterable[list[Union[str, int, float]]],
+    output_file_path: Union[str, Path],
+    column_names: list[str] = REFORMATTED_HEADER,
+) -> int:
+    """
+    Write parsed rows to a CSV file as they are produced, without building a DataFrame.
 
-    return data
+    None is written as an empty field and floats use their repr (e.g. 396.0), so the output matches
+    pd.DataFrame(rows, columns=column_names).to_csv(index=False) when no int column has a missing
+    value.  Otherwise the output intentionally differs: pandas upcasts an int column that contains a
+    missing value to float for every row (e.g. age 36 is written as 36.0), which cannot be known
+    while streaming, so ints are always written as ints here.
 
+    Args:
+        rows (Iterable[list[Union[str, int, float]]]): rows to write (e.g. from iter_grit_file_rows)
+        output_file_path (Union[str, Path]): CSV output file path
+        column_names (list[str], optional): header to write. Defaults to REFORMATTED_HEADER.
 
-def parse_grit_html(html_text: str) -> pd.DataFrame:
+    Returns:
+        int: number of rows written
     """
-    Parse the GRIT HTML table node and build a Pandas dataframe with the results
+    num_rows = 0
+    with open(output_file_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file, lineterminator=os.linesep)
+        writer.writerow(column_names)
+        for row in rows:
+            writer.writerow(row)
+            num_rows += 1
+    return num_rows
+
+
+class LazyGritResult:
+    """
+    Column-on-demand view of a parsed GRIT HTML table.
+
+    The row and cell nodes are located (and validated) once when the object is created.  Each column
+    is decoded with its handler the first time it is accessed and then memoized, so consumers that
+    only need a few columns never pay for the rest.
+    """
+
+    def __init__(self, table_body: Union[etree._Element, None], include_keys: bool = False):
+        """
+        Args:
+            table_body (Union[etree._Element, None]): node to parse (with tag == 'tbody')
+            include_keys (bool, optional): also provide KEY_COLUMNS. Defaults to False.
+
+        Raises:
+            ValueError: node isn't formatted as expected
+        """
+        self.columns = get_column_names(include_keys)
+        self._handlers = dict(zip(REFORMATTED_HEADER, get_handlers()))
+        self._cells = get_grit_table_cells(table_body, len(REFORMATTED_HEADER))
+        self._decoded = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, column_name: str) -> bool:
+        return column_name in self.columns
+
+    def __getitem__(self, column_name: str) -> list[Union[None, str, int, float]]:
+        """
+        Return the decoded values of a column, decoding it on first access.
+
+        Args:
+            column_name (str): column name (one of REFORMATTED_HEADER)
+
+        Raises:
+            KeyError: column_name is not recognized
+
+        Returns:
+            list[Union[None, str, int, float]]: one value per row
+        """
+        if column_name not in self._decoded:
+            if column_name not in self.columns:
+                raise KeyError(column_name)
+            if column_name in KEY_COLUMNS:
+                self._decode_keys()
+                return self._decoded[column_name]
+            handler = self._handlers[column_name]
+            pos = self.columns.index(column_name)
+            self._decoded[column_name] = [handler(cells[pos]) for cells in self._cells]
+        return self._decoded[column_name]
+
+    def _decode_keys(self) -> None:
+        """
+        Decode all KEY_COLUMNS at once from the data-result-url attribute of each row
+        """
+        keys = [
+            parse_result_url(cells[0].getparent().get("data-result-url")) for cells in self._cells
+        ]
+        for pos, column_name in enumerate(KEY_COLUMNS):
+            self._decoded[column_name] = [key[pos] for key in keys]
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Decode any remaining columns and build a Pandas dataframe equal to parse_grit_html output.
+
+        Returns:
+            pd.DataFrame: df
+        """
+        import pandas as pd
+
+        data = {column_name: self[column_name] for column_name in self.columns}
+        return pd.DataFrame(data, columns=self.columns)
+
+
+def get_grit_table_cells(
+    table_body: Union[etree._Element, None], num_columns: int
+) -> list[list[etree._Element]]:
+    """
+    Validate the table body and return the data nodes of each row without parsing them.
+
+    Args:
+        table_body (Union[etree._Element, None]): node to parse (with tag == 'tbody')
+        num_columns (int): expected number of data nodes in each row
+
+    Raises:
+        ValueError: node isn't formatted as expected
+
+    Returns:
+        list[list[etree._Element]]: data nodes (with tag == 'td') for each row
+    """
+    check_grit_table_body(table_body)
+
+    cells = []
+    for row_node in table_body:
+        check_grit_table_row(row_node, num_columns)
+        cells.append(list(row_node))
+
+    return cells
+
+
+def find_grit_table_body(html_text: str) -> Union[etree._Element, None]:
+    """
+    Parse the GRIT HTML text, verify the table header and return the table body node
 
     Args:
         html_text (str): input HTML text to parse
@@ -286,7 +813,7 @@ def parse_grit_html(html_text: str) -> pd.DataFrame:
         ValueError: header does not match what was expected (maybe format has changed?)
 
     Returns:
-        pd.DataFrame: df
+        Union[etree._Element, None]: table body node (with tag == 'tbody') or None if not found
     """
     # parse table header to verify it matches what is expected
     root = etree.HTML(html_text)
@@ -297,12 +824,59 @@ def parse_grit_html(html_text: str) -> pd.DataFrame:
             "header does not match what was expected.  Are you parsing the correct file?"
         )
 
-    column_names = REFORMATTED_HEADER
-    handlers = get_handlers()
+    return root.find("body/table/tbody")
+
+
+def parse_grit_html(
+    html_text: str,
+    lazy: bool = False,
+    include_keys: bool = False,
+    engine: str = "lxml",
+    defects: list[tuple] = None,
+) -> Union["pd.DataFrame", LazyGritResult]:
+    """
+    Parse the GRIT HTML table node and build a Pandas dataframe with the results
+
+    Args:
+        html_text (str): input HTML text to parse
+        lazy (bool, optional): return a LazyGritResult that decodes columns on first access instead
+            of a dataframe. Defaults to False.
+        include_keys (bool, optional): add integer KEY_COLUMNS (race_id, result_set_id,
+            participant_id) parsed from each row's data-result-url. Defaults to False.
+        engine (str, optional): one of ENGINES (lazy results always use lxml). Defaults to "lxml".
+        defects (list[tuple], optional): parse leniently, appending each bad value to this list as a
+            (row, column, raw_text, reason) tuple and using None in its place (see
+            validation.validate_grit_html for a full defect report). Defaults to None (raise).
+
+    Raises:
+        ValueError: header does not match what was expected (maybe format has changed?)
+
+    Returns:
+        Union[pd.DataFrame, LazyGritResult]: df (or lazy result if lazy is True)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine ({engine}) must be one of {ENGINES}")
+    if lazy and engine != "lxml":
+        raise ValueError("lazy results are only supported by the lxml engine")
+    if lazy and defects is not None:
+        raise ValueError("defects are not collected for lazy results")
+
+    if engine == "fast":
+        from fast_scanner import parse_grit_rows_fast
+
+        data = parse_grit_rows_fast(html_text, include_keys, defects)
+    else:
+        table_body = find_grit_table_body(html_text)
+        if lazy:
+            return LazyGritResult(table_body, include_keys)
+        handlers = get_handlers()
+
+        # parse table body
+        data = parse_grit_table_body(table_body, handlers, include_keys, defects)
+
+    import pandas as pd
 
-    # parse table body
-    table_body = root.find("body/table/tbody")
-    data = parse_grit_table_body(table_body, handlers)
+    column_names = get_column_names(include_keys)
 
     df = pd.DataFrame(data, columns=column_names)
 
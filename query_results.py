@@ -0,0 +1,236 @@
+import argparse
+import heapq
+import math
+import sys
+
+from columnar_cache import ColumnarCache
+
+# columns shown when --columns is not given (the sort column is added when it is not one of these)
+DEFAULT_COLUMNS = ["place", "name", "gender", "age", "state", "country"]
+
+
+def parse_age_range(s: str) -> tuple[int, int]:
+    """
+    Parse an age range argument (e.g. "40-49" or "40")
+
+    Args:
+        s (str): age range
+
+    Raises:
+        argparse.ArgumentTypeError: age range is not formatted as expected
+
+    Returns:
+        tuple[int, int]: inclusive (min age, max age)
+    """
+    parts = s.split("-")
+    if len(parts) not in (1, 2) or not all(part.isdigit() for part in parts):
+        raise argparse.ArgumentTypeError(f"age range must be formatted as 'MIN-MAX' ('{s}')")
+    return int(parts[0]), int(parts[-1])
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list[str], optional): arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: args contains the subcommand and its options
+    """
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # options shared by all subcommands
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--cache",
+        "-c",
+        dest="cache_dir",
+        type=str,
+        required=True,
+        help="columnar cache directory (written by parse_results.py --cache)",
+    )
+    common.add_argument(
+        "--columns",
+        dest="columns",
+        type=str,
+        nargs="+",
+        default=None,
+        help=f"columns to display (default: {' '.join(DEFAULT_COLUMNS)})",
+    )
+
+    # filters shared by the subcommands that select rows
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--gender", type=str, default=None, help="e.g. F")
+    filters.add_argument(
+        "--age", dest="age_range", type=parse_age_range, default=None, help="e.g. 40-49"
+    )
+    filters.add_argument("--state", type=str, default=None, help="e.g. CO")
+    filters.add_argument("--country", type=str, default=None, help="e.g. US")
+
+    # options to sort rows
+    sorting = argparse.ArgumentParser(add_help=False)
+    sorting.add_argument(
+        "--by",
+        dest="by",
+        type=str,
+        required=True,
+        help="numeric column to rank by (e.g. elevation_gain_ft, distance_miles, pace_seconds)",
+    )
+    sorting.add_argument(
+        "--ascending", action="store_true", help="rank smallest values first (e.g. for pace)"
+    )
+
+    top_parser = subparsers.add_parser(
+        "top", parents=[common, filters, sorting], help="show the top runners by a column"
+    )
+    top_parser.add_argument("-n", dest="n", type=int, default=20, help="number of runners")
+
+    rank_parser = subparsers.add_parser(
+        "rank", parents=[common, filters, sorting], help="show a runner's rank by a column"
+    )
+    rank_parser.add_argument("--bib", type=int, required=True, help="bib of the runner")
+
+    find_parser = subparsers.add_parser("find", parents=[common], help="find runners")
+    find_group = find_parser.add_mutually_exclusive_group(required=True)
+    find_group.add_argument("--bib", type=int, default=None, help="bib to find")
+    find_group.add_argument("--name", type=str, default=None, help="name (case insensitive part)")
+
+    subparsers.add_parser("filter", parents=[common, filters], help="show all matching runners")
+
+    return parser.parse_args(argv)
+
+
+def select_rows(cache: ColumnarCache, args: argparse.Namespace) -> list[int]:
+    """
+    Return the positions of the rows that pass the filters (only filtered columns are read)
+
+    Args:
+        cache (ColumnarCache): cache
+        args (argparse.Namespace): parsed arguments with gender, age_range, state and country
+
+    Returns:
+        list[int]: row positions
+    """
+    positions = range(len(cache))
+    for column_name in ("gender", "state", "country"):
+        value = getattr(args, column_name)
+        if value is not None:
+            column = cache[column_name]
+            positions = [pos for pos in positions if column[pos] == value]
+    if args.age_range is not None:
+        age_min, age_max = args.age_range
+        column = cache["age"]
+        positions = [pos for pos in positions if age_min <= column[pos] <= age_max]
+    return list(positions)
+
+
+def sort_rows(
+    cache: ColumnarCache, positions: list[int], by: str, ascending: bool, n: int = None
+) -> list[int]:
+    """
+    Sort row positions by a numeric column (missing values are dropped)
+
+    Args:
+        cache (ColumnarCache): cache
+        positions (list[int]): row positions
+        by (str): numeric column name
+        ascending (bool): smallest values first
+        n (int, optional): only return the first n positions. Defaults to None (all).
+
+    Raises:
+        ValueError: column is not numeric
+
+    Returns:
+        list[int]: sorted row positions
+    """
+    if cache.column_types[by] == "str":
+        raise ValueError(f"cannot rank by text column '{by}'")
+    column = cache[by]
+    positions = [pos for pos in positions if not math.isnan(column[pos])]
+
+    sign = 1 if ascending else -1
+
+    def key(pos):
+        # ties are broken by row order (i.e. by place)
+        return sign * column[pos], pos
+
+    if n is None:
+        return sorted(positions, key=key)
+    return heapq.nsmallest(n, positions, key=key)
+
+
+def print_table(
+    cache: ColumnarCache, positions: list[int], columns: list[str], ranks: list[int] = None
+) -> None:
+    """
+    Print rows as an aligned table
+
+    Args:
+        cache (ColumnarCache): cache
+        positions (list[int]): row positions to print
+        columns (list[str]): columns to print
+        ranks (list[int], optional): rank of each row printed as the first column. Defaults to None.
+    """
+    header = ([] if ranks is None else ["rank"]) + columns
+    table = [header]
+    for i, pos in enumerate(positions):
+        row = [] if ranks is None else [str(ranks[i])]
+        row.extend(cache.format_value(column_name, pos) for column_name in columns)
+        table.append(row)
+
+    widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+    for row in table:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+def get_display_columns(args: argparse.Namespace) -> list[str]:
+    if args.columns is not None:
+        return args.columns
+    by = getattr(args, "by", None)
+    if by is not None and by not in DEFAULT_COLUMNS:
+        return DEFAULT_COLUMNS + [by]
+    return DEFAULT_COLUMNS
+
+
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    cache = ColumnarCache(args.cache_dir)
+    columns = get_display_columns(args)
+    for column_name in columns + [getattr(args, "by", None) or "place"]:
+        if column_name not in cache.column_types:
+            raise ValueError(f"column '{column_name}' is not in the cache")
+
+    if args.command == "top":
+        positions = sort_rows(cache, select_rows(cache, args), args.by, args.ascending, args.n)
+        print_table(cache, positions, columns, ranks=list(range(1, len(positions) + 1)))
+
+    elif args.command == "rank":
+        bibs = cache["bib"]
+        positions = sort_rows(cache, select_rows(cache, args), args.by, args.ascending)
+        matches = [i for i, pos in enumerate(positions) if bibs[pos] == args.bib]
+        if not matches:
+            print(f"bib {args.bib} is not ranked (not found or filtered out)", file=sys.stderr)
+            sys.exit(1)
+        print(f"rank {matches[0] + 1} of {len(positions)}")
+        print_table(cache, [positions[matches[0]]], columns, ranks=[matches[0] + 1])
+
+    elif args.command == "find":
+        if args.bib is not None:
+            bibs = cache["bib"]
+            positions = [pos for pos in range(len(cache)) if bibs[pos] == args.bib]
+        else:
+            name = args.name.lower()
+            names = cache["name"]
+            positions = [
+                pos for pos in range(len(cache)) if names[pos] and name in names[pos].lower()
+            ]
+        print_table(cache, positions, columns)
+
+    elif args.command == "filter":
+        print_table(cache, select_rows(cache, args), columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Share the parsed results with worker processes through multiprocessing.shared_memory.
+
+The columns are published once into a single shared memory block: numeric columns as their raw
+buffers and text columns dictionary-encoded as int32 codes, with the distinct values stored in the
+block as concatenated UTF-8 bytes and int64 offsets.  The spec only holds column names, dtypes and
+offsets, so it stays small however many distinct values there are.  Workers attach to the block and
+get numpy views without copying, so memory stays flat as the number of workers grows and per-task
+startup is near zero.
+
+Each process keeps the view of the dataset it attached to last.  Attaching to a different dataset
+drops the previous view, so long-lived workers do not accumulate views across publish/close cycles.
+
+Example:
+    with SharedDataset.publish(df) as dataset:
+        with ProcessPoolExecutor() as pool:
+            results = list(pool.map(report, repeat(dataset.spec), states))
+
+    def report(spec, state):
+        view = attach_shared_dataset(spec)  # attached once per worker process
+        return view["elevation_gain_ft"][view.equal_mask("state", state)].sum()
+"""
+
+import sys
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+# numpy dtypes stored as raw buffers (all other columns are dictionary-encoded)
+NUMERIC_KINDS = "biuf"
+
+# codes are int32 with -1 for missing values
+CODES_DTYPE = np.dtype(np.int32)
+
+# start of each distinct value in the UTF-8 bytes of a dictionary (plus the end of the last one)
+CATEGORY_OFFSETS_DTYPE = np.dtype(np.int64)
+
+# column offsets are aligned so that every view is aligned for its dtype
+ALIGNMENT = 8
+
+# dataset attached in this process, keyed by shared memory block name (see attach_shared_dataset)
+_ATTACHED = {}
+
+# serializes the resource tracker patch in _open_shared_memory
+_REGISTER_LOCK = threading.Lock()
+
+
+def _align(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _open_shared_memory(name: str) -> SharedMemory:
+    """
+    Attach to an existing shared memory block without registering it with the resource tracker
+
+    Before Python 3.13, attaching registers the block with the resource tracker, which then warns
+    about (and unlinks) the block when a worker exits even though the publisher owns it.  To avoid
+    this, resource_tracker.register is replaced for the duration of the call.  This is not
+    thread-safe: concurrent calls are serialized by a lock, but another thread creating a
+    SharedMemory block (or using the resource tracker) at the same time would not be registered.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    with _REGISTER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _encode_categories(column_name: str, uniques: pd.Index) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encode the distinct values of a text column as int64 offsets and concatenated UTF-8 bytes
+    """
+    encoded = []
+    for value in uniques:
+        if not isinstance(value, str):
+            raise ValueError(f"column '{column_name}' must be numeric or text, but got {value!r}")
+        encoded.append(value.encode("utf-8"))
+    offsets = np.zeros(len(encoded) + 1, dtype=CATEGORY_OFFSETS_DTYPE)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, data
+
+
+class SharedDataset:
+    """
+    Owner of a shared memory block holding the columns of a dataframe.
+
+    Use as a context manager (or call close()) to release the block once all workers are done.
+    """
+
+    def __init__(self, shm: SharedMemory, spec: dict):
+        self._shm = shm
+        self.spec = spec
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame) -> "SharedDataset":
+        """
+        Copy the columns of a dataframe into a new shared memory block
+
+        Args:
+            df (pd.DataFrame): dataframe (e.g. parse_grit_html output)
+
+        Raises:
+            ValueError: a column is neither numeric nor text
+
+        Returns:
+            SharedDataset: published dataset (pass dataset.spec to the workers)
+        """
+        # encode each column and lay the buffers out one after another
+        arrays = []
+        columns = []
+        offset = 0
+
+        def add_array(values: np.ndarray) -> int:
+            nonlocal offset
+            array_offset = offset
+            arrays.append((values, array_offset))
+            offset = _align(offset + values.nbytes)
+            return array_offset
+
+        for column_name in df.columns:
+            series = df[column_name]
+            if series.dtype.kind in NUMERIC_KINDS:
+                values = series.to_numpy()
+                categories = None
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                values = codes.astype(CODES_DTYPE, copy=False)
+                category_offsets, category_data = _encode_categories(column_name, uniques)
+                categories = {
+                    "num_categories": len(uniques),
+                    "offsets_offset": add_array(category_offsets),
+                    "data_offset": add_array(category_data),
+                }
+            columns.append(
+                {
+                    "name": column_name,
+                    "dtype": values.dtype.str,
+                    "offset": add_array(values),
+                    "categories": categories,
+                }
+            )
+
+        shm = SharedMemory(create=True, size=max(offset, 1))
+        for values, array_offset in arrays:
+            view = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=array_offset)
+            view[:] = values
+            del view
+
+        spec = {"shm_name": shm.name, "num_rows": len(df), "columns": columns}
+        return cls(shm, spec)
+
+    def close(self) -> None:
+        """
+        Release and remove the shared memory block
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedDataset":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedDatasetView:
+    """
+    Zero-copy, read-only view of a published dataset.
+
+    The distinct values of a text column are decoded from the block on first use.
+    """
+
+    def __init__(self, spec: dict):
+        """
+        Args:
+            spec (dict): SharedDataset.spec
+        """
+        self._shm = _open_shared_memory(spec["shm_name"])
+        self.num_rows = spec["num_rows"]
+        self.columns = [column["name"] for column in spec["columns"]]
+        self._arrays = {}
+        self._category_arrays = {}
+        self._categories = {}
+        for column in spec["columns"]:
+            self._arrays[column["name"]] = self._get_array(
+                self.num_rows, column["dtype"], column["offset"]
+            )
+            categories = column["categories"]
+            if categories is not None:
+                offsets = self._get_array(
+                    categories["num_categories"] + 1,
+                    CATEGORY_OFFSETS_DTYPE,
+                    categories["offsets_offset"],
+                )
+                data = self._get_array(int(offsets[-1]), np.uint8, categories["data_offset"])
+                self._category_arrays[column["name"]] = (offsets, data)
+
+    def _get_array(self, length: int, dtype: Union[str, np.dtype], offset: int) -> np.ndarray:
+        """
+        Return a read-only array backed by the shared memory block
+        """
+        values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+        values.flags.writeable = False
+        return values
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, column_name: str) -> Union[np.ndarray, pd.Categorical]:
+        """
+        Return a column (numeric columns are not copied)
+
+        NOTE: pd.Categorical.from_codes copies (and downcasts) the codes of a text column on every
+        call.  Use codes() or equal_mask() to work with the shared codes instead.
+
+        Args:
+            column_name (str): column name
+
+        Returns:
+            Union[np.ndarray, pd.Categorical]: numeric values or dictionary-encoded text
+        """
+        values = self._arrays[column_name]
+        if column_name not in self._category_arrays:
+            return values
+        return pd.Categorical.from_codes(values, categories=self.categories(column_name))
+
+    def categories(self, column_name: str) -> list[str]:
+        """
+        Return the distinct values of a dictionary-encoded column (decoded once per view)
+
+        Args:
+            column_name (str): column name
+
+        Raises:
+            ValueError: column is not dictionary-encoded
+
+        Returns:
+            list[str]: distinct values in code order
+        """
+        if column_name not in self._category_arrays:
+            raise ValueError(f"column '{column_name}' is not dictionary-encoded")
+        if column_name not in self._categories:
+            offsets, data = self._category_arrays[column_name]
+            data = data.tobytes()
+            offsets = offsets.tolist()
+            self._categories[column_name] = [
+                data[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+        return self._categories[column_name]
+
+    def codes(self, column_name: str) -> np.ndarray:
+        """
+        Return the int32 codes of a dictionary-encoded column (-1 for missing values)
+
+        Args:
+            column_name (str): column name
+
+        Raises:
+            ValueError: column is not dictionary-encoded
+
+        Returns:
+            np.ndarray: codes (index into self.categories(column_name))
+        """
+        if column_name not in self._category_arrays:
+            raise ValueError(f"column '{column_name}' is not dictionary-encoded")
+        return self._arrays[column_name]
+
+    def equal_mask(self, column_name: str, value: str) -> np.ndarray:
+        """
+        Return which rows of a dictionary-encoded column are equal to a value
+
+        The shared codes are compared with the value's code, so the column is not copied.
+
+        Args:
+            column_name (str): column name
+            value (str): value to compare with
+
+        Raises:
+            ValueError: column is not dictionary-encoded
+
+        Returns:
+            np.ndarray: boolean mask (all False if the value does not appear in the column)
+        """
+        codes = self.codes(column_name)
+        categories = self.categories(column_name)
+        if value not in categories:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == categories.index(value)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Build a dataframe whose numeric columns are backed by the shared buffers (text columns have
+        a categorical dtype with copied codes)
+
+        Returns:
+            pd.DataFrame: df
+        """
+        return pd.DataFrame(
+            {column_name: self[column_name] for column_name in self.columns}, copy=False
+        )
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory block (arrays returned by the view must no longer be used)
+
+        Raises:
+            BufferError: arrays returned by the view are still referenced
+        """
+        self._arrays = {}
+        self._category_arrays = {}
+        self._categories = {}
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+def attach_shared_dataset(spec: dict) -> SharedDatasetView:
+    """
+    Attach to a published dataset, reusing the view if this process has already attached to it
+
+    Only the most recently attached dataset is kept.  The view of a previous dataset is dropped
+    (and its block unmapped once nothing refers to it any more), so that worker processes that
+    outlive a dataset do not keep it mapped.
+
+    Args:
+        spec (dict): SharedDataset.spec
+
+    Returns:
+        SharedDatasetView: view
+    """
+    view = _ATTACHED.get(spec["shm_name"])
+    if view is None:
+        _ATTACHED.clear()
+        view = SharedDatasetView(spec)
+        _ATTACHED[spec["shm_name"]] = view
+    return view
+
+
+def detach_shared_dataset(spec: dict) -> None:
+    """
+    Close the view of a dataset attached with attach_shared_dataset (if any)
+
+    Args:
+        spec (dict): SharedDataset.spec
+
+    Raises:
+        BufferError: arrays returned by the view are still referenced
+    """
+    view = _ATTACHED.pop(spec["shm_name"], None)
+    if view is not None:
+        view.close()
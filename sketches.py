@@ -0,0 +1,448 @@
+"""
+Mergeable sketches (quantiles plus fixed-bin histograms) of the parsed GRIT results.
+
+A sketch is built once per parsed file and saved next to the CSV output.  Season-wide distribution
+stats over any set of files are then computed by merging the saved sketches instead of re-reading
+and concatenating the rows.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Iterable, Union
+
+from parsing import REFORMATTED_HEADER, time_text_to_seconds
+
+SKETCH_FORMAT_VERSION = 1
+
+# relative accuracy of the quantile estimates (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# fixed histogram bins for each sketched column: (start, bin width, number of bins)
+HISTOGRAM_BINS = {
+    "elevation_gain_ft": (0.0, 1000.0, 200),
+    "distance_miles": (0.0, 10.0, 100),
+    "age": (0.0, 5.0, 24),
+    "pace_min_per_mile": (0.0, 0.5, 120),
+}
+
+SKETCHED_COLUMNS = list(HISTOGRAM_BINS)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy guarantees (DDSketch).
+
+    Values are counted in logarithmically sized buckets so that any quantile estimate is within
+    relative_accuracy of the true value.  Two sketches built with the same relative_accuracy are
+    merged by adding bucket counts.  Count, mean, variance, min and max are tracked exactly.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy ({relative_accuracy}) must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """
+        Add a single (non-negative) value to the sketch
+
+        Args:
+            value (float): value to add
+
+        Raises:
+            ValueError: value is negative
+        """
+        if value < 0:
+            raise ValueError(f"value ({value}) must be non-negative")
+        if value == 0:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+        # Welford's online update
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Merge another sketch into this one in place
+
+        Args:
+            other (QuantileSketch): sketch to merge
+
+        Raises:
+            ValueError: sketches were built with different relative accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative_accuracy")
+        if other.count == 0:
+            return
+
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+
+        # Chan et al. parallel update of mean and sum of squared deviations
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Union[float, None]:
+        """
+        Estimate the q-quantile (linear rank q * (count - 1), as used by pandas)
+
+        Args:
+            q (float): quantile between 0 and 1
+
+        Raises:
+            ValueError: q is not between 0 and 1
+
+        Returns:
+            Union[float, None]: estimate or None if the sketch is empty
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q ({q}) must be between 0 and 1")
+        if self.count == 0:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        cumulative = self.zero_count
+        if cumulative > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative > rank:
+                estimate = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def std(self) -> Union[float, None]:
+        """
+        Sample standard deviation (ddof=1, as used by pandas)
+
+        Returns:
+            Union[float, None]: std or None if there are fewer than two values
+        """
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": sorted(self.buckets.items()),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        sketch = cls(d["relative_accuracy"])
+        sketch.buckets = {int(index): count for index, count in d["buckets"]}
+        sketch.zero_count = d["zero_count"]
+        sketch.count = d["count"]
+        sketch.mean = d["mean"]
+        sketch.m2 = d["m2"]
+        if sketch.count:
+            sketch.min = d["min"]
+            sketch.max = d["max"]
+        return sketch
+
+
+class FixedBinHistogram:
+    """
+    Histogram with fixed, equal-width bins (plus underflow and overflow counts).
+
+    Histograms with identical bins are merged by adding counts.
+    """
+
+    def __init__(self, start: float, width: float, num_bins: int):
+        if width <= 0 or num_bins < 1:
+            raise ValueError("width must be positive and num_bins must be at least 1")
+        self.start = start
+        self.width = width
+        self.num_bins = num_bins
+        self.counts = [0] * num_bins
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self) -> list[float]:
+        return [self.start + i * self.width for i in range(self.num_bins + 1)]
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Count a single value
+
+        Args:
+            value (float): value to add
+            count (int, optional): number of times to count the value (-1 removes a value that was
+                added before). Defaults to 1.
+        """
+        i = math.floor((value - self.start) / self.width)
+        if i < 0:
+            self.underflow += count
+        elif i >= self.num_bins:
+            self.overflow += count
+        else:
+            self.counts[i] += count
+
+    def merge(self, other: "FixedBinHistogram") -> None:
+        """
+        Merge another histogram into this one in place
+
+        Args:
+            other (FixedBinHistogram): histogram to merge
+
+        Raises:
+            ValueError: histogram bins do not match
+        """
+        if (other.start, other.width, other.num_bins) != (self.start, self.width, self.num_bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start,
+            "width": self.width,
+            "num_bins": self.num_bins,
+            "counts": self.counts,
+            "underflow": self.underflow,
+            "overflow": self.overflow,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "FixedBinHistogram":
+        histogram = cls(d["start"], d["width"], d["num_bins"])
+        if len(d["counts"]) != histogram.num_bins:
+            raise ValueError("Expected one count per histogram bin")
+        histogram.counts = list(d["counts"])
+        histogram.underflow = d["underflow"]
+        histogram.overflow = d["overflow"]
+        return histogram
+
+
+class ColumnSketch:
+    """
+    Quantile sketch and fixed-bin histogram for a single column (missing values are counted).
+    """
+
+    def __init__(self, column_name: str, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if column_name not in HISTOGRAM_BINS:
+            raise ValueError(f"column_name ({column_name}) must be one of {SKETCHED_COLUMNS}")
+        self.column_name = column_name
+        self.quantiles = QuantileSketch(relative_accuracy)
+        self.histogram = FixedBinHistogram(*HISTOGRAM_BINS[column_name])
+        self.missing = 0
+
+    def add(self, value: Union[None, float]) -> None:
+        if value is None:
+            self.missing += 1
+            return
+        self.quantiles.add(value)
+        self.histogram.add(value)
+
+    def merge(self, other: "ColumnSketch") -> None:
+        if other.column_name != self.column_name:
+            raise ValueError("Cannot merge sketches of different columns")
+        self.quantiles.merge(other.quantiles)
+        self.histogram.merge(other.histogram)
+        self.missing += other.missing
+
+    def describe(self) -> dict[str, Union[None, float]]:
+        """
+        Summary statistics matching the rows of pd.Series.describe() (quartiles are estimates)
+
+        Returns:
+            dict[str, Union[None, float]]: count, mean, std, min, 25%, 50%, 75%, max
+        """
+        sketch = self.quantiles
+        return {
+            "count": float(sketch.count),
+            "mean": sketch.mean if sketch.count else None,
+            "std": sketch.std(),
+            "min": sketch.quantile(0.0),
+            "25%": sketch.quantile(0.25),
+            "50%": sketch.quantile(0.5),
+            "75%": sketch.quantile(0.75),
+            "max": sketch.quantile(1.0),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "quantiles": self.quantiles.to_dict(),
+            "histogram": self.histogram.to_dict(),
+            "missing": self.missing,
+        }
+
+    @classmethod
+    def from_dict(cls, column_name: str, d: dict) -> "ColumnSketch":
+        column_sketch = cls(column_name)
+        column_sketch.quantiles = QuantileSketch.from_dict(d["quantiles"])
+        column_sketch.histogram = FixedBinHistogram.from_dict(d["histogram"])
+        column_sketch.missing = d["missing"]
+        return column_sketch
+
+
+class ResultsSketch:
+    """
+    Sketches of elevation_gain_ft, distance_miles, age and pace (in minutes per mile) for a set of
+    parsed rows.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.num_rows = 0
+        self.columns = {
+            column_name: ColumnSketch(column_name, relative_accuracy)
+            for column_name in SKETCHED_COLUMNS
+        }
+        self._positions = {
+            column_name: REFORMATTED_HEADER.index(column_name)
+            for column_name in ("elevation_gain_ft", "distance_miles", "age", "pace")
+        }
+
+    def add_row(self, row: list[Union[None, str, int, float]]) -> None:
+        """
+        Add a single parsed row (one value per column in REFORMATTED_HEADER)
+
+        Args:
+            row (list[Union[None, str, int, float]]): row
+        """
+        self.num_rows += 1
+        for column_name in ("elevation_gain_ft", "distance_miles", "age"):
+            self.columns[column_name].add(row[self._positions[column_name]])
+
+        pace = row[self._positions["pace"]]
+        pace_min_per_mile = None if pace is None else time_text_to_seconds(pace) / 60
+        self.columns["pace_min_per_mile"].add(pace_min_per_mile)
+
+    def add_rows(
+        self, rows: Iterable[list[Union[None, str, int, float]]]
+    ) -> Iterable[list[Union[None, str, int, float]]]:
+        """
+        Add rows to the sketch as they pass through (so that the sketch can be built while the rows
+        are streamed to another consumer such as write_grit_csv)
+
+        Args:
+            rows (Iterable[list[Union[None, str, int, float]]]): rows
+
+        Yields:
+            Iterable[list[Union[None, str, int, float]]]: the unchanged rows
+        """
+        for row in rows:
+            self.add_row(row)
+            yield row
+
+    def merge(self, other: "ResultsSketch") -> None:
+        """
+        Merge another sketch into this one in place
+
+        Args:
+            other (ResultsSketch): sketch to merge
+        """
+        self.num_rows += other.num_rows
+        for column_name, column_sketch in self.columns.items():
+            column_sketch.merge(other.columns[column_name])
+
+    def describe(self) -> dict[str, dict[str, Union[None, float]]]:
+        """
+        Summary statistics for each sketched column (see ColumnSketch.describe)
+
+        Returns:
+            dict[str, dict[str, Union[None, float]]]: column name -> summary statistics
+        """
+        return {
+            column_name: column_sketch.describe()
+            for column_name, column_sketch in self.columns.items()
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SKETCH_FORMAT_VERSION,
+            "num_rows": self.num_rows,
+            "columns": {
+                column_name: column_sketch.to_dict()
+                for column_name, column_sketch in self.columns.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ResultsSketch":
+        if d.get("version") != SKETCH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format version ({d.get('version')})")
+        sketch = cls()
+        sketch.num_rows = d["num_rows"]
+        sketch.columns = {
+            column_name: ColumnSketch.from_dict(column_name, column_d)
+            for column_name, column_d in d["columns"].items()
+        }
+        return sketch
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        with open(file_path, "w") as out_file:
+            json.dump(self.to_dict(), out_file)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "ResultsSketch":
+        with open(file_path, "r") as in_file:
+            return cls.from_dict(json.load(in_file))
+
+
+def get_sketch_file_path(output_file_path: Union[str, Path]) -> Path:
+    """
+    Return the path of the sketch saved next to a parsed output file
+    (e.g. output/example-results-01.csv -> output/example-results-01.sketch.json)
+
+    Args:
+        output_file_path (Union[str, Path]): CSV output file path
+
+    Returns:
+        Path: sketch file path
+    """
+    output_file_path = Path(output_file_path)
+    return output_file_path.with_name(f"{output_file_path.stem}.sketch.json")
+
+
+def merge_sketch_files(file_paths: Iterable[Union[str, Path]]) -> ResultsSketch:
+    """
+    Load and merge saved sketches
+
+    Args:
+        file_paths (Iterable[Union[str, Path]]): sketch file paths
+
+    Returns:
+        ResultsSketch: merged sketch
+    """
+    merged = ResultsSketch()
+    for file_path in file_paths:
+        merged.merge(ResultsSketch.load(file_path))
+    return merged
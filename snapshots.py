@@ -0,0 +1,84 @@
+"""
+Helpers shared by the features that are refreshed incrementally from snapshots of the results
+(crews.py and summaries.py): indexing a snapshot by bib, finding the bibs whose values changed
+between two snapshots and saving the per-runner frames as JSON.
+"""
+
+import pandas as pd
+
+
+def index_by_bib(df: pd.DataFrame, column_names: list[str]) -> pd.DataFrame:
+    """
+    Return the given columns of a snapshot indexed by bib
+
+    Args:
+        df (pd.DataFrame): parsed results (parse_grit_html output or the CSV written from it)
+        column_names (list[str]): columns to keep
+
+    Raises:
+        ValueError: a bib appears more than once
+
+    Returns:
+        pd.DataFrame: column_names indexed by bib
+    """
+    if df["bib"].duplicated().any():
+        raise ValueError("Expected each bib to appear once")
+    return df[["bib"] + column_names].set_index("bib")
+
+
+def get_changed_keys(
+    old: pd.DataFrame, new: pd.DataFrame, column_names: list[str] = None
+) -> pd.Index:
+    """
+    Return the keys that were added, removed or whose values changed between two snapshots
+
+    Missing values are equal to each other.
+
+    Args:
+        old (pd.DataFrame): previous snapshot indexed by key (e.g. bib)
+        new (pd.DataFrame): new snapshot indexed by key
+        column_names (list[str], optional): columns to compare. Defaults to None (all columns).
+
+    Returns:
+        pd.Index: changed keys (sorted)
+    """
+    if column_names is not None:
+        old = old[column_names]
+        new = new[column_names]
+
+    # align the old and new values of every key seen in either snapshot
+    index = old.index.union(new.index)
+    old = old.reindex(index)
+    new = new.reindex(index)
+    same = (old == new) | (old.isna() & new.isna())
+    return index[~same.all(axis=1)]
+
+
+def frame_to_state(df: pd.DataFrame) -> dict:
+    """
+    Convert an indexed frame to a JSON-serializable dict (missing values become None)
+
+    Args:
+        df (pd.DataFrame): frame with a named index
+
+    Returns:
+        dict: columns (index name first) and data rows
+    """
+    df = df.reset_index().astype(object)
+    return df.where(df.notna(), None).to_dict(orient="split", index=False)
+
+
+def frame_from_state(state: dict) -> pd.DataFrame:
+    """
+    Convert a dict saved with frame_to_state back to a frame indexed by its first column
+
+    NOTE: column dtypes are not saved, so callers convert the columns they need.
+
+    Args:
+        state (dict): frame_to_state output
+
+    Returns:
+        pd.DataFrame: df
+    """
+    df = pd.DataFrame(state["data"], columns=state["columns"])
+    return df.set_index(state["columns"][0])
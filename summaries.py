@@ -0,0 +1,274 @@
+"""
+Summaries shown in explore_grit_results.ipynb (country, state and gender counts, histograms and the
+elevation ranking) maintained incrementally from snapshot deltas.
+
+The summary state is saved next to the parsed output.  When a new snapshot is parsed, it is compared
+with the runners stored in the previous state and only the runners that were added, removed or
+changed are removed from and added to the counts, histograms and ranking, so the result is always
+identical to a full recompute.
+"""
+
+import bisect
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+from parsing import is_missing
+from sketches import HISTOGRAM_BINS, FixedBinHistogram
+from snapshots import frame_from_state, frame_to_state, get_changed_keys, index_by_bib
+
+# columns that the summaries are computed from
+SUMMARY_COLUMNS = ["gender", "state", "country", "distance_miles", "elevation_gain_ft", "age"]
+
+# columns stored for each runner (place and name are only displayed in the elevation ranking)
+RUNNER_COLUMNS = ["place", "name"] + SUMMARY_COLUMNS
+
+NUMERIC_COLUMNS = ["place", "distance_miles", "elevation_gain_ft", "age"]
+
+HISTOGRAM_COLUMNS = ["elevation_gain_ft", "distance_miles", "age"]
+
+# state counts only include runners from this country (as in the notebook)
+STATE_COUNTRY = "US"
+
+
+def get_runners(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the columns needed for the summaries indexed by bib
+
+    Args:
+        df (pd.DataFrame): parsed results (parse_grit_html output or the CSV written from it)
+
+    Raises:
+        ValueError: a bib appears more than once
+
+    Returns:
+        pd.DataFrame: runners with RUNNER_COLUMNS indexed by bib
+    """
+    runners = index_by_bib(df, RUNNER_COLUMNS)
+    runners[NUMERIC_COLUMNS] = runners[NUMERIC_COLUMNS].astype(float)
+    return runners
+
+
+class ResultsSummary:
+    """
+    Country, state and gender counts, histograms and the elevation ranking of a snapshot.
+
+    The summaries only depend on SUMMARY_COLUMNS, so an update from a new snapshot re-counts only
+    the runners whose values in these columns changed.
+    """
+
+    def __init__(self, runners: pd.DataFrame):
+        """
+        Create empty summaries (use from_snapshot or load)
+
+        Args:
+            runners (pd.DataFrame): runners with RUNNER_COLUMNS indexed by bib
+        """
+        self.runners = runners
+        self.country_counts = Counter()
+        self.state_counts = Counter()
+        self.gender_counts = Counter()
+        self.histograms = {
+            column_name: FixedBinHistogram(*HISTOGRAM_BINS[column_name])
+            for column_name in HISTOGRAM_COLUMNS
+        }
+
+        # (-elevation_gain_ft, bib) of each runner with an elevation gain, kept sorted so that the
+        # ranking is highest first with ties broken by bib
+        self.ranking = []
+
+    @classmethod
+    def from_snapshot(cls, df: pd.DataFrame) -> "ResultsSummary":
+        """
+        Compute the summaries from scratch
+
+        Args:
+            df (pd.DataFrame): parsed results
+
+        Returns:
+            ResultsSummary: summary
+        """
+        summary = cls(get_runners(df))
+        for values in summary._iter_summary_values(summary.runners):
+            summary._count(values, 1)
+        summary.ranking = summary._get_ranking_keys(summary.runners)
+        summary.ranking.sort()
+        return summary
+
+    @staticmethod
+    def _iter_summary_values(runners: pd.DataFrame):
+        return runners[SUMMARY_COLUMNS].itertuples(index=False, name=None)
+
+    @staticmethod
+    def _get_ranking_keys(runners: pd.DataFrame) -> list[tuple[float, int]]:
+        elevation = runners["elevation_gain_ft"]
+        ranked = elevation.notna()
+        return list(zip((-elevation[ranked]).tolist(), runners.index[ranked].tolist()))
+
+    def _count(self, values: tuple, count: int) -> None:
+        """
+        Add (count=1) or remove (count=-1) a runner's values from the counts and histograms
+        """
+        values = dict(
+            zip(SUMMARY_COLUMNS, (None if is_missing(value) else value for value in values))
+        )
+        counters = [
+            (self.country_counts, values["country"]),
+            (self.gender_counts, values["gender"]),
+        ]
+        if values["country"] == STATE_COUNTRY:
+            counters.append((self.state_counts, values["state"]))
+        for counter, key in counters:
+            counter[key] += count
+            if counter[key] == 0:
+                del counter[key]
+
+        for column_name, histogram in self.histograms.items():
+            if values[column_name] is not None:
+                histogram.add(values[column_name], count)
+
+    @property
+    def num_runners(self) -> int:
+        return len(self.runners)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Update the summaries from a new snapshot of the results
+
+        Args:
+            df (pd.DataFrame): parsed results
+
+        Returns:
+            int: number of runners that were added, removed or changed
+        """
+        new_runners = get_runners(df)
+        old_runners = self.runners
+
+        changed = get_changed_keys(old_runners, new_runners, SUMMARY_COLUMNS)
+
+        removed = old_runners.loc[old_runners.index.intersection(changed)]
+        added = new_runners.loc[new_runners.index.intersection(changed)]
+        for values in self._iter_summary_values(removed):
+            self._count(values, -1)
+        for values in self._iter_summary_values(added):
+            self._count(values, 1)
+        for key in self._get_ranking_keys(removed):
+            del self.ranking[bisect.bisect_left(self.ranking, key)]
+        for key in self._get_ranking_keys(added):
+            bisect.insort(self.ranking, key)
+
+        # place and name are always taken from the latest snapshot
+        self.runners = new_runners
+        return len(changed)
+
+    def _count_table(self, counter: Counter, column_name: str) -> pd.DataFrame:
+        """
+        Build a table of counts sorted by count (most first) with the fraction of all runners
+        """
+        items = sorted(counter.items(), key=lambda item: (-item[1], item[0] is None, item[0] or ""))
+        table = pd.DataFrame(items, columns=[column_name, "count"])
+        table["fraction"] = table["count"] / self.num_runners
+        return table
+
+    def country_table(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: country (including missing), count and fraction of all runners
+        """
+        return self._count_table(self.country_counts, "country")
+
+    def state_table(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: state, count and fraction of all runners for runners from STATE_COUNTRY
+        """
+        return self._count_table(self.state_counts, "state")
+
+    def gender_table(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: gender, count and fraction of all runners
+        """
+        return self._count_table(self.gender_counts, "gender")
+
+    def elevation_ranking(self, n: int = None) -> pd.DataFrame:
+        """
+        Return runners ranked by elevation gain (runners without an elevation gain are not ranked)
+
+        Args:
+            n (int, optional): only return the top n runners. Defaults to None (all).
+
+        Returns:
+            pd.DataFrame: elevation_place, bib and RUNNER_COLUMNS
+        """
+        keys = self.ranking if n is None else self.ranking[:n]
+        ranking = self.runners.loc[[bib for _, bib in keys]].reset_index()
+        ranking.insert(0, "elevation_place", range(1, len(ranking) + 1))
+        return ranking
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        """
+        Save the summary state (including the sorted ranking, so that loading does not sort)
+
+        Args:
+            file_path (Union[str, Path]): JSON output file path
+        """
+        state = {
+            "runners": frame_to_state(self.runners),
+            "country_counts": list(self.country_counts.items()),
+            "state_counts": list(self.state_counts.items()),
+            "gender_counts": list(self.gender_counts.items()),
+            "histograms": {
+                column_name: histogram.to_dict()
+                for column_name, histogram in self.histograms.items()
+            },
+            "ranking": self.ranking,
+        }
+        with open(file_path, "w") as out_file:
+            json.dump(state, out_file)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "ResultsSummary":
+        """
+        Load a summary saved with save()
+
+        Args:
+            file_path (Union[str, Path]): JSON input file path
+
+        Returns:
+            ResultsSummary: summary
+        """
+        with open(file_path, "r") as in_file:
+            state = json.load(in_file)
+
+        runners = frame_from_state(state["runners"])
+        runners[NUMERIC_COLUMNS] = runners[NUMERIC_COLUMNS].astype(float)
+
+        summary = cls(runners)
+        summary.country_counts = Counter(dict(map(tuple, state["country_counts"])))
+        summary.state_counts = Counter(dict(map(tuple, state["state_counts"])))
+        summary.gender_counts = Counter(dict(map(tuple, state["gender_counts"])))
+        summary.histograms = {
+            column_name: FixedBinHistogram.from_dict(d)
+            for column_name, d in state["histograms"].items()
+        }
+        summary.ranking = [tuple(key) for key in state["ranking"]]
+        return summary
+
+
+def get_summary_file_path(output_file_path: Union[str, Path]) -> Path:
+    """
+    Return the path of the summary state saved next to a parsed output file
+    (e.g. output/example-results-01.csv -> output/example-results-01.summary.json)
+
+    Args:
+        output_file_path (Union[str, Path]): CSV output file path
+
+    Returns:
+        Path: summary file path
+    """
+    output_file_path = Path(output_file_path)
+    return output_file_path.with_name(f"{output_file_path.stem}.summary.json")
@@ -0,0 +1,81 @@
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from summaries import ResultsSummary, get_summary_file_path
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Raises:
+        ValueError: if an input file does not exist
+
+    Returns:
+        argparse.Namespace: args contains input_file_path, previous_file_path and num_runners
+    """
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        dest="input_file_path",
+        type=str,
+        required=True,
+        help="CSV input file path (snapshot written by parse_results.py)",
+    )
+    parser.add_argument(
+        "--previous",
+        "-p",
+        dest="previous_file_path",
+        type=str,
+        default=None,
+        help="summary state of the previous snapshot (*.summary.json) to update from the changed "
+        "rows instead of recomputing",
+    )
+    parser.add_argument(
+        "-n",
+        dest="num_runners",
+        type=int,
+        default=15,
+        help="number of runners to show in the elevation ranking",
+    )
+
+    args = parser.parse_args()
+    if not os.path.isfile(args.input_file_path):
+        raise ValueError(f"input_file_path does not exist: {args.input_file_path}")
+    if args.previous_file_path is not None and not os.path.isfile(args.previous_file_path):
+        raise ValueError(f"previous_file_path does not exist: {args.previous_file_path}")
+
+    return args
+
+
+def main():
+    args = parse_args()
+    input_file_path = Path(args.input_file_path)
+
+    df = pd.read_csv(input_file_path)
+
+    # refresh the summaries from the previous state (only changed runners are re-counted)
+    if args.previous_file_path is not None:
+        summary = ResultsSummary.load(args.previous_file_path)
+        num_changed = summary.update(df)
+        print(f"re-counted {num_changed} added, removed or changed runners")
+    else:
+        summary = ResultsSummary.from_snapshot(df)
+
+    # save the state next to the snapshot so that the next snapshot can be updated from it
+    summary.save(get_summary_file_path(input_file_path))
+
+    for table in (summary.country_table(), summary.state_table(), summary.gender_table()):
+        print()
+        print(table.to_string(index=False))
+    print()
+    print(summary.elevation_ranking(args.num_runners).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from parsing import get_column_names
+
+# checked-in throughput and memory measurements that the perf tests are compared against
+PERF_BASELINE_FILE_PATH = Path(__file__).parent / "perf_baseline.json"
+
+# GRIT results table with a single row as saved from runsignup.com
+SINGLE_ENTRY_TABLE_HTML = """<table class="results results--rowHover" id="resultsTable">
+    <thead>
+        <tr>
+            <th>Place</th>
+            <th>Bib</th>
+            <th>Name</th>
+            <th>Gender</th>
+            <th>City</th>
+            <th>State</th>
+            <th>Country</th>
+            <th>Clock<br>Time</th>
+            <th>Chip<br>Time</th>
+            <th class="noSort">Distance in Miles</th>
+            <th class="noSort">Progress</th>
+            <th class="noSort">Elevation Gain</th>
+            <th>Pace</th>
+            <th>Age</th>
+            <th>Age<br>Percentage<i class="icon icon-info tippy-tip" tabindex="0"
+                    data-tippy-content="This shows how well you performed based on your age.  Higher numbers are better, with 100% being the best."
+                    aria-expanded="false"></i></th>
+            <th class="noSort">Run Crew Name</th>
+        </tr>
+    </thead>
+    <tbody>
+        <tr data-result-url="/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U89338374">
+            <td class="place">1</td>
+            <td class="bib">2533</td>
+            <td class="ta-left">
+                <div class="participantName">
+                    <div class="participantName__image">
+                        <div class="rsuCircleImg rsuCircleImg--xs rsuCircleImg--firstChar"><span>R</span></div>
+                    </div>
+                    <div class="participantName__name">
+                        <div class="participantName__name__firstName">Matthew</div>
+                        <div class="participantName__name__lastName">Perkett</div>
+                    </div>
+                </div>
+            </td>
+            <td>M</td>
+            <td>Golden</td>
+            <td>CO</td>
+            <td>US</td>
+            <td class="time">34:42:29</td>
+            <td class="time"></td>
+            <td>259.06</td>
+            <td>64.8%</td>
+            <td>396ft (120.7m)</td>
+            <td class="time">8:02</td>
+            <td>36</td>
+            <td>96.7</td>
+            <td></td>
+        </tr>
+    </tbody>
+</table>
+"""
+
+
+def make_row(include_keys: bool = False, **values) -> list:
+    """
+    Helper to build a parsed row from keyword column values (all other columns are None)
+
+    Args:
+        include_keys (bool, optional): append the KEY_COLUMNS values. Defaults to False.
+        **values: value of each column to set (e.g. bib=2533)
+
+    Returns:
+        list: row with one value per get_column_names(include_keys)
+    """
+    column_names = get_column_names(include_keys)
+    unknown = set(values) - set(column_names)
+    if unknown:
+        raise ValueError(f"unknown columns: {sorted(unknown)}")
+    return [values.get(column_name) for column_name in column_names]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-perf",
+        action="store_true",
+        default=False,
+        help="run the performance and memory budget tests (marked perf)",
+    )
+    parser.addoption(
+        "--update-perf-baseline",
+        action="store_true",
+        default=False,
+        help="run the perf tests and save the measurements as the new baseline",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-perf") or config.getoption("--update-perf-baseline"):
+        return
+    skip_perf = pytest.mark.skip(reason="performance test (use --run-perf to run)")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
+
+class PerfReport:
+    """
+    Compare measurements with the baseline and collect them for the summary table.
+    """
+
+    def __init__(self, baseline: dict, update: bool):
+        """
+        Args:
+            baseline (dict): contents of PERF_BASELINE_FILE_PATH
+            update (bool): record the measurements as the new baseline instead of checking them
+        """
+        self.baseline = baseline
+        self.update = update
+        self.rows = []
+
+    def check(self, name: str, rows_per_sec: float, peak_mib: float) -> None:
+        """
+        Record a measurement and check it against the baseline budgets
+
+        Throughput must be at least the baseline divided by max_slowdown, and the tracemalloc peak
+        must be at most the baseline times max_memory_growth.
+
+        Args:
+            name (str): benchmark name
+            rows_per_sec (float): measured throughput
+            peak_mib (float): measured tracemalloc peak in MiB
+        """
+        benchmarks = self.baseline["benchmarks"]
+        if self.update:
+            benchmarks[name] = {"rows_per_sec": round(rows_per_sec), "peak_mib": round(peak_mib, 2)}
+            self.rows.append((name, "rows/sec", rows_per_sec, rows_per_sec, None, "updated"))
+            self.rows.append((name, "peak MiB", peak_mib, peak_mib, None, "updated"))
+            return
+
+        if name not in benchmarks:
+            pytest.fail(f"no baseline for '{name}' (run with --update-perf-baseline)")
+        expected = benchmarks[name]
+        tolerances = self.baseline["tolerances"]
+        min_rows_per_sec = expected["rows_per_sec"] / tolerances["max_slowdown"]
+        max_peak_mib = expected["peak_mib"] * tolerances["max_memory_growth"]
+        speed_ok = rows_per_sec >= min_rows_per_sec
+        memory_ok = peak_mib <= max_peak_mib
+        self.rows.append(
+            (
+                name,
+                "rows/sec",
+                expected["rows_per_sec"],
+                rows_per_sec,
+                f">= {min_rows_per_sec:,.0f}",
+                "ok" if speed_ok else "FAIL",
+            )
+        )
+        self.rows.append(
+            (
+                name,
+                "peak MiB",
+                expected["peak_mib"],
+                peak_mib,
+                f"<= {max_peak_mib:,.2f}",
+                "ok" if memory_ok else "FAIL",
+            )
+        )
+        assert speed_ok, f"{name}: {rows_per_sec:,.0f} rows/sec is below {min_rows_per_sec:,.0f}"
+        assert memory_ok, f"{name}: peak of {peak_mib:,.2f} MiB is above {max_peak_mib:,.2f} MiB"
+
+    def format_table(self) -> list[str]:
+        """
+        Returns:
+            list[str]: lines of the comparison table
+        """
+        table = [["benchmark", "metric", "baseline", "measured", "ratio", "budget", "status"]]
+        for name, metric, expected, measured, budget, status in self.rows:
+            table.append(
+                [
+                    name,
+                    metric,
+                    f"{expected:,.2f}",
+                    f"{measured:,.2f}",
+                    f"{measured / expected:.2f}",
+                    budget or "",
+                    status,
+                ]
+            )
+        widths = [max(len(row[i]) for row in table) for i in range(len(table[0]))]
+        return ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in table]
+
+    def save(self, file_path: Path) -> None:
+        with open(file_path, "w") as out_file:
+            json.dump(self.baseline, out_file, indent=4)
+            out_file.write("\n")
+
+
+_perf_report_key = pytest.StashKey[PerfReport]()
+
+
+@pytest.fixture(scope="session")
+def perf_report(request) -> PerfReport:
+    with open(PERF_BASELINE_FILE_PATH, "r") as in_file:
+        baseline = json.load(in_file)
+    update = request.config.getoption("--update-perf-baseline")
+    report = PerfReport(baseline, update)
+    request.config.stash[_perf_report_key] = report
+    yield report
+    if update:
+        report.save(PERF_BASELINE_FILE_PATH)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    report = config.stash.get(_perf_report_key, None)
+    if report is None or not report.rows:
+        return
+    terminalreporter.section("performance budgets")
+    for line in report.format_table():
+        terminalreporter.write_line(line.rstrip())
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from crews import CrewStandings, compute_crew_standings
+
+
+class TestCrewStandings:
+    """
+    Test run crew standings
+    """
+
+    df_01 = pd.DataFrame(
+        {
+            "bib": [1, 2, 3, 4, 5],
+            "run_crew_name": ["Ducks", "Ducks", "Beavers", None, "Beavers"],
+            "distance_miles": [100.0, 50.0, 80.0, 500.0, np.nan],
+            "elevation_gain_ft": [1000.0, 3000.0, 2000.0, 9000.0, 500.0],
+        }
+    )
+
+    # bib 2 ran more, bib 4 joined a crew, bib 5 left, bib 6 is new
+    df_02 = pd.DataFrame(
+        {
+            "bib": [1, 2, 3, 4, 5, 6],
+            "run_crew_name": ["Ducks", "Ducks", "Beavers", "Beavers", None, "Huskies"],
+            "distance_miles": [100.0, 60.0, 80.0, 500.0, 10.0, 5.0],
+            "elevation_gain_ft": [1000.0, 3500.0, 2000.0, 9000.0, 500.0, 0.0],
+        }
+    )
+
+    def test_compute_crew_standings(self):
+        """
+        Standings in one group pass (missing distances are excluded from the mean)
+        """
+        standings = compute_crew_standings(self.df_01)
+        expected = pd.DataFrame(
+            {
+                "run_crew_name": ["Ducks", "Beavers"],
+                "member_count": [2, 2],
+                "total_miles": [150.0, 80.0],
+                "mean_miles": [75.0, 80.0],
+                "total_elevation_ft": [4000.0, 2500.0],
+                "mean_elevation_ft": [2000.0, 1250.0],
+            }
+        )
+        pd.testing.assert_frame_equal(standings, expected, check_dtype=False)
+
+    def test_update(self):
+        """
+        Incremental update only re-aggregates changed members and matches a full recompute
+        """
+        crew_standings = CrewStandings.from_snapshot(self.df_01)
+        num_changed = crew_standings.update(self.df_02)
+        assert num_changed == 4
+
+        expected = compute_crew_standings(self.df_02)
+        assert crew_standings.standings().equals(expected)
+        assert crew_standings.update(self.df_02) == 0
+
+    def test_update_example_results(self):
+        """
+        Incremental update of the example results is exactly equal to a full recompute (the totals
+        do not drift)
+        """
+        output_dir = Path(__file__).parents[1] / "output"
+        df_01 = pd.read_csv(output_dir / "example-results-01.csv")
+        df_02 = pd.read_csv(output_dir / "example-results-02.csv")
+        crew_standings = CrewStandings.from_snapshot(df_01)
+        crew_standings.update(df_02)
+        assert crew_standings.standings().equals(compute_crew_standings(df_02))
+        crew_standings.update(df_01)
+        assert crew_standings.standings().equals(compute_crew_standings(df_01))
+
+    def test_compute_crew_standings_rounding(self):
+        """
+        Distances are rounded to thousandths of a mile and elevation gains to whole feet
+        """
+        df = self.df_01.assign(
+            distance_miles=[100.0004, 50.0, 80.0, 500.0, 1.0006],
+            elevation_gain_ft=[1000.4, 3000.0, 2000.0, 9000.0, 500.6],
+        )
+        standings = compute_crew_standings(df).set_index("run_crew_name")
+        assert standings.loc["Ducks", "total_miles"] == 150.0
+        assert standings.loc["Ducks", "total_elevation_ft"] == 4000.0
+        assert standings.loc["Beavers", "total_miles"] == 81.001
+        assert standings.loc["Beavers", "total_elevation_ft"] == 2501.0
+
+    def test_save_and_load(self, tmp_path):
+        """
+        Standings are unchanged after saving and loading
+        """
+        crew_standings = CrewStandings.from_snapshot(self.df_01)
+        crew_standings.save(tmp_path / "state.json")
+        loaded = CrewStandings.load(tmp_path / "state.json")
+        assert loaded.standings().equals(crew_standings.standings())
+
+        loaded.update(self.df_02)
+        assert loaded.standings().equals(compute_crew_standings(self.df_02))
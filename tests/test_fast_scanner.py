@@ -0,0 +1,120 @@
+import pytest
+from conftest import SINGLE_ENTRY_TABLE_HTML
+
+from fast_scanner import UnexpectedMarkupError, parse_grit_rows_fast, scan_grit_rows
+from parsing import (
+    find_grit_table_body,
+    get_handlers,
+    iter_grit_file_rows,
+    parse_grit_html,
+    parse_grit_table_body,
+)
+
+
+def parse_with_lxml(html_text, include_keys=False):
+    """
+    Helper to parse with the existing lxml handlers
+    """
+    table_body = find_grit_table_body(html_text)
+    return parse_grit_table_body(table_body, get_handlers(), include_keys)
+
+
+class TestFastScanner:
+    """
+    Test that the fast scanner gives the same results as the lxml handlers
+    """
+
+    html_text = SINGLE_ENTRY_TABLE_HTML
+
+    # compact markup as saved by the browser / obfuscate_html_table: self-closing empty cells, a
+    # profile image, a run crew link and a character reference
+    compact_row = (
+        '<tr data-result-url="/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U18419576">'
+        '<td class="place">3</td><td class="bib">914</td><td class="ta-left">'
+        '<div class="participantName">\n    <div class="participantName__image">\n'
+        '        <div class="rsuCircleImg rsuCircleImg--xs" style="background-image: '
+        'url(&quot;https://example.com/user_profile.png&quot;);"><span/></div>\n    </div>\n'
+        '    <div class="participantName__name">\n'
+        '        <div class="participantName__name__firstName">Pippin</div>\n'
+        '        <div class="participantName__name__lastName">Lovegood</div>\n    </div>\n'
+        "</div></td><td>F</td><td>Winston &amp; Salem</td><td>MD</td><td>US</td>"
+        '<td class="time">117:11:53</td><td class="time"/><td>513.71</td><td>171.2%</td>'
+        '<td>125,443ft (38,235.0m)</td><td class="time">13:41</td><td>45</td><td/>'
+        '<td><a href="/Race/Results/90618/TeamResults/TeamDetails-28511-673418" target="_blank">'
+        'Adventures for the Cure <i class="icon icon-external-link" aria-hidden="true"/></a></td>'
+        "</tr>"
+    )
+    compact_html_text = html_text.replace("</tbody>", compact_row + "</tbody>")
+
+    def test_scan_grit_rows(self):
+        """
+        Same rows as the lxml handlers (with and without keys)
+        """
+        for html_text in (self.html_text, self.compact_html_text):
+            for include_keys in (False, True):
+                data = scan_grit_rows(html_text, include_keys)
+                assert data == parse_with_lxml(html_text, include_keys)
+
+        data = scan_grit_rows(self.compact_html_text)
+        assert data[1][2] == "Pippin Lovegood"
+        assert data[1][4] == "Winston & Salem"
+        assert data[1][8] is None
+
+    def test_scan_grit_rows_unexpected_markup(self):
+        """
+        Unexpected markup raises UnexpectedMarkupError
+        """
+        html_text = self.html_text.replace("<td>Golden</td>", "<td><b>Golden</b></td>")
+        with pytest.raises(UnexpectedMarkupError):
+            scan_grit_rows(html_text)
+
+    @pytest.mark.parametrize(
+        "old,new",
+        [
+            ("<td>Golden</td>", "<td><b>Golden</b></td>"),
+            ("<td>Golden</td>", "<td>Golden<!-- comment --></td>"),
+            ("<td>CO</td>", "<TD>CO</TD>"),
+            ("</tr>\n    </tbody>", "\n    </tbody>"),
+            # text that libxml2 rewrites
+            ("<td>Golden</td>", "<td>Gol\r\nden</td>"),
+            ("<td>Golden</td>", "<td>Gol\0den</td>"),
+            ("<td>Golden</td>", "<td>Gol&#1;den</td>"),
+            ("<td>Golden</td>", "<td>Gol&#65535;den</td>"),
+        ],
+    )
+    def test_parse_grit_rows_fast_fallback(self, old, new):
+        """
+        Fall back to lxml on unexpected markup
+        """
+        html_text = self.html_text.replace(old, new)
+        assert html_text != self.html_text
+        with pytest.raises(UnexpectedMarkupError):
+            scan_grit_rows(html_text)
+        assert parse_grit_rows_fast(html_text) == parse_with_lxml(html_text)
+
+    def test_parse_grit_rows_fast_error(self):
+        """
+        Errors are raised by the lxml path when the scanner falls back
+        """
+        html_text = self.html_text.replace("<th>Bib</th>", "<th>Bib Number</th>")
+        with pytest.raises(ValueError) as e_info:
+            parse_grit_rows_fast(html_text)
+        expected_msg = "header does not match what was expected.  Are you parsing the correct file?"
+        assert e_info.value.args[0] == expected_msg
+
+    def test_engine_option(self, tmp_path):
+        """
+        The fast engine is selectable when parsing a string or a file
+        """
+        df = parse_grit_html(self.compact_html_text, engine="fast")
+        expected_df = parse_grit_html(self.compact_html_text)
+        assert df.equals(expected_df)
+
+        input_file_path = tmp_path / "results.html"
+        input_file_path.write_text(self.compact_html_text)
+        data = list(iter_grit_file_rows(input_file_path, engine="fast"))
+        assert data == list(iter_grit_file_rows(input_file_path))
+
+        with pytest.raises(ValueError) as e_info:
+            list(iter_grit_file_rows(input_file_path, engine="unknown"))
+        assert e_info.value.args[0] == "engine (unknown) must be one of ['lxml', 'fast']"
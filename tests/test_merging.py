@@ -0,0 +1,71 @@
+import pytest
+from conftest import make_row
+
+from merging import RowMerger, get_row_key
+
+# key values shared by every row of the result set
+RESULT_SET_KEYS = {"race_id": 90618, "result_set_id": 459362}
+
+
+class TestRowMerger:
+    """
+    Test merging partial exports
+    """
+
+    page_01 = [
+        make_row(True, place=1, bib=2533, participant_id=89338374, **RESULT_SET_KEYS),
+        make_row(True, place=2, bib=1501, participant_id=48787588, **RESULT_SET_KEYS),
+        make_row(True, place=3, bib=914, participant_id=1, **RESULT_SET_KEYS),
+    ]
+    page_02 = [
+        make_row(True, place=3, bib=914, participant_id=1, **RESULT_SET_KEYS),
+        make_row(True, place=4, bib=1948, participant_id=2, **RESULT_SET_KEYS),
+        make_row(True, place=7, bib=100, participant_id=None, **RESULT_SET_KEYS),
+    ]
+
+    def test_get_row_key(self):
+        """
+        Key combines the integer keys with bib (or falls back to bib alone)
+        """
+        assert get_row_key(self.page_01[0]) == (90618, 459362, 89338374, 2533)
+        assert get_row_key(self.page_02[2]) == ("bib", 100)
+
+    def test_merge(self):
+        """
+        Overlapping rows are dropped and place gaps are reported
+        """
+        merger = RowMerger()
+        rows = list(merger.merge([self.page_01, self.page_02]))
+        assert rows == self.page_01 + self.page_02[1:]
+        assert merger.num_rows_read == 6
+        assert merger.num_rows_kept == 5
+        assert merger.num_duplicates == 1
+        assert merger.conflicts == []
+        assert merger.get_place_gaps() == [(5, 6)]
+
+    def test_merge_conflict(self):
+        """
+        Duplicate keys with different values are reported and the first row is kept
+        """
+        row = make_row(
+            True, place=3, bib=914, participant_id=1, name="Steve Prefontaine", **RESULT_SET_KEYS
+        )
+        merger = RowMerger()
+        rows = list(merger.merge([self.page_01, [row]]))
+        assert rows == self.page_01
+        assert merger.conflicts == [(90618, 459362, 1, 914)]
+        assert merger.get_place_gaps() == []
+
+    def test_merge_error(self):
+        """
+        Exports of different races cannot be merged
+        """
+        merger = RowMerger()
+        row = make_row(True, place=4, bib=1948, participant_id=2, race_id=1, result_set_id=459362)
+        with pytest.raises(ValueError) as e_info:
+            list(merger.merge([self.page_01, [row]]))
+        expected_msg = (
+            "rows are from different result sets ((90618, 459362) and (1, 459362)).  "
+            "Are you merging exports of the same results?"
+        )
+        assert e_info.value.args[0] == expected_msg
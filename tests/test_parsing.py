@@ -1,18 +1,33 @@
 import copy
+import csv
+import subprocess
+import sys
 from pathlib import Path
 
 import pandas as pd
 import pytest
+from conftest import SINGLE_ENTRY_TABLE_HTML
 from lxml import etree
 
 from parsing import (
+    KEY_COLUMNS,
+    REFORMATTED_HEADER,
+    LazyGritResult,
+    build_key_index,
+    check_grit_table_body,
     elevation_gain_handler,
     get_handlers,
     get_simple_value_handler,
+    is_missing,
+    iter_grit_file_rows,
     parse_grit_html,
     parse_grit_table_body,
     parse_grit_table_header,
+    parse_result_url,
     participant_name_handler,
+    run_crew_name_handler,
+    time_text_to_seconds,
+    write_grit_csv,
 )
 
 
@@ -139,6 +154,86 @@ class TestHandlers:
         )
         assert e_info.value.args[0] == expected_msg
 
+    def test_run_crew_name_handler(self):
+        """
+        Run crew name is the text of the team results link
+        """
+        node_str = (
+            '<td><a href="/Race/Results/90618/TeamResults/TeamDetails-28511-673418" '
+            'target="_blank">Ducks <i class="icon icon-external-link" aria-hidden="true"/></a></td>'
+        )
+        node = etree.HTML(node_str).find("body/td")
+        assert run_crew_name_handler(node) == "Ducks"
+        assert run_crew_name_handler(self.td_str_node) == "Golden"
+
+        node = etree.HTML("<td></td>").find("body/td")
+        assert run_crew_name_handler(node) is None
+
+    def test_run_crew_name_handler_error(self):
+        """
+        Error when the run crew name node has an unexpected child
+        """
+        node = etree.HTML("<td><b>Ducks</b></td>").find("body/td")
+        with pytest.raises(ValueError) as e_info:
+            run_crew_name_handler(node)
+        expected_msg = "Expected run crew name node to have a single child with tag 'a'"
+        assert e_info.value.args[0] == expected_msg
+
+    def test_time_text_to_seconds(self):
+        """
+        Convert pace and clock time strings to seconds
+        """
+        assert time_text_to_seconds("8:02") == 482
+        assert time_text_to_seconds("34:42:29") == 124949
+
+    def test_time_text_to_seconds_error(self):
+        """
+        Error when time string is not formatted as expected
+        """
+        with pytest.raises(ValueError) as e_info:
+            time_text_to_seconds("NONE")
+        assert e_info.value.args[0] == "time text is not formatted as expected ('NONE')"
+
+
+class TestResultKeys:
+    """
+    Test extracting integer keys from data-result-url
+    """
+
+    def test_parse_result_url(self):
+        """
+        Parse race id, result set id and participant id
+        """
+        url = "/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U89338374"
+        assert parse_result_url(url) == (90618, 459362, 89338374)
+        assert parse_result_url(None) == (None, None, None)
+
+    def test_parse_result_url_error(self):
+        """
+        Error when URL does not have a participant id
+        """
+        url = "/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362"
+        with pytest.raises(ValueError) as e_info:
+            parse_result_url(url)
+        expected_msg = f"result URL is not formatted as expected ('{url}')"
+        assert e_info.value.args[0] == expected_msg
+
+    def test_is_missing(self):
+        """
+        None and NaN are missing (empty strings and zeros are not)
+        """
+        assert is_missing(None)
+        assert is_missing(float("nan"))
+        assert not any(is_missing(value) for value in ("", 0, 0.0, "NONE"))
+
+    def test_build_key_index(self):
+        """
+        Rows sharing a key are all indexed and rows with missing keys are skipped
+        """
+        keys = [(1, 2, 3), (1, 2, 4), (None, None, None), (1, 2, 3), (1, 2, float("nan"))]
+        index = build_key_index(keys)
+        assert index == {(1, 2, 3): [0, 3], (1, 2, 4): [1]}
+
 
 class TestParsingFunctions:
     """
@@ -164,61 +259,7 @@ class TestParsingFunctions:
         "Run Crew Name",
     ]
 
-    single_entry_table_html_str = """<table class="results results--rowHover" id="resultsTable">
-    <thead>
-        <tr>
-            <th>Place</th>
-            <th>Bib</th>
-            <th>Name</th>
-            <th>Gender</th>
-            <th>City</th>
-            <th>State</th>
-            <th>Country</th>
-            <th>Clock<br>Time</th>
-            <th>Chip<br>Time</th>
-            <th class="noSort">Distance in Miles</th>
-            <th class="noSort">Progress</th>
-            <th class="noSort">Elevation Gain</th>
-            <th>Pace</th>
-            <th>Age</th>
-            <th>Age<br>Percentage<i class="icon icon-info tippy-tip" tabindex="0"
-                    data-tippy-content="This shows how well you performed based on your age.  Higher numbers are better, with 100% being the best."
-                    aria-expanded="false"></i></th>
-            <th class="noSort">Run Crew Name</th>
-        </tr>
-    </thead>
-    <tbody>
-        <tr data-result-url="/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U89338374">
-            <td class="place">1</td>
-            <td class="bib">2533</td>
-            <td class="ta-left">
-                <div class="participantName">
-                    <div class="participantName__image">
-                        <div class="rsuCircleImg rsuCircleImg--xs rsuCircleImg--firstChar"><span>R</span></div>
-                    </div>
-                    <div class="participantName__name">
-                        <div class="participantName__name__firstName">Matthew</div>
-                        <div class="participantName__name__lastName">Perkett</div>
-                    </div>
-                </div>
-            </td>
-            <td>M</td>
-            <td>Golden</td>
-            <td>CO</td>
-            <td>US</td>
-            <td class="time">34:42:29</td>
-            <td class="time"></td>
-            <td>259.06</td>
-            <td>64.8%</td>
-            <td>396ft (120.7m)</td>
-            <td class="time">8:02</td>
-            <td>36</td>
-            <td>96.7</td>
-            <td></td>
-        </tr>
-    </tbody>
-</table>
-"""
+    single_entry_table_html_str = SINGLE_ENTRY_TABLE_HTML
     table_header_node = etree.HTML(single_entry_table_html_str).find("body/table/thead")
     table_body_node = etree.HTML(single_entry_table_html_str).find("body/table/tbody")
 
@@ -319,6 +360,29 @@ class TestParsingFunctions:
         expected_msg = "Expected table_header to have a single child with tag 'tr'"
         assert e_info.value.args[0] == expected_msg
 
+    def test_check_grit_table_body_error_01(self):
+        """
+        Table body node is None
+        """
+        with pytest.raises(ValueError) as e_info:
+            check_grit_table_body(None)
+        assert e_info.value.args[0] == "table_body is None"
+
+    def test_check_grit_table_body_error_02(self):
+        """
+        Table body node has zero children (checked the same way by the eager and lazy parsers)
+        """
+        node = copy.copy(self.table_body_node)
+        node.clear()
+        node.tag = "tbody"
+        expected_msg = "Expected table_body to have one or more children"
+        with pytest.raises(ValueError) as e_info:
+            parse_grit_table_body(node, get_handlers())
+        assert e_info.value.args[0] == expected_msg
+        with pytest.raises(ValueError) as e_info:
+            LazyGritResult(node)
+        assert e_info.value.args[0] == expected_msg
+
     def test_parse_grit_table_body(self):
         """
         Parse table body properly
@@ -333,3 +397,118 @@ class TestParsingFunctions:
         """
         df = parse_grit_html(self.single_entry_table_html_str)
         pd.testing.assert_frame_equal(df, self.expected_df)
+
+    def test_iter_grit_file_rows(self, tmp_path):
+        """
+        Incrementally parse an HTML file
+        """
+        input_file_path = tmp_path / "results.html"
+        input_file_path.write_text(self.single_entry_table_html_str)
+        data = list(iter_grit_file_rows(input_file_path))
+        assert data == self.expected_data
+
+    def test_iter_grit_file_rows_non_ascii(self, tmp_path):
+        """
+        Non-ASCII names are decoded as UTF-8 by every engine (the file has no <meta charset>)
+        """
+        html_text = self.single_entry_table_html_str.replace("Matthew", "José")
+        input_file_path = tmp_path / "results.html"
+        input_file_path.write_text(html_text, encoding="utf-8")
+        expected_data = parse_grit_html(html_text).values.tolist()
+        assert expected_data[0][2] == "José Perkett"
+        for engine in ("lxml", "fast"):
+            data = list(iter_grit_file_rows(input_file_path, engine=engine))
+            assert data == expected_data
+
+    def test_iter_grit_file_rows_error(self, tmp_path):
+        """
+        Header does not match what was expected
+        """
+        input_file_path = tmp_path / "results.html"
+        input_file_path.write_text(self.single_entry_table_html_str.replace("Bib", "Bib Number"))
+        with pytest.raises(ValueError) as e_info:
+            list(iter_grit_file_rows(input_file_path))
+        expected_msg = "header does not match what was expected.  Are you parsing the correct file?"
+        assert e_info.value.args[0] == expected_msg
+
+    def test_write_grit_csv(self, tmp_path):
+        """
+        Streaming CSV output is identical to writing the dataframe with pandas
+        """
+        output_file_path = tmp_path / "streamed.csv"
+        expected_file_path = tmp_path / "expected.csv"
+        num_rows = write_grit_csv(self.expected_data, output_file_path)
+        self.expected_df.to_csv(expected_file_path, header=True, index=False)
+        assert num_rows == 1
+        assert output_file_path.read_bytes() == expected_file_path.read_bytes()
+
+    def test_write_grit_csv_missing_int(self, tmp_path):
+        """
+        Ints are written as ints even when the column has a missing value (pandas would write floats)
+        """
+        row_01 = list(self.expected_data[0])
+        row_02 = list(self.expected_data[0])
+        row_02[REFORMATTED_HEADER.index("age")] = None
+        output_file_path = tmp_path / "streamed.csv"
+        write_grit_csv([row_01, row_02], output_file_path)
+        with open(output_file_path, newline="") as in_file:
+            ages = [row[REFORMATTED_HEADER.index("age")] for row in csv.reader(in_file)]
+        assert ages == ["age", "36", ""]
+        df = pd.read_csv(output_file_path)
+        assert df["age"].tolist()[0] == 36.0
+        assert pd.isna(df["age"].tolist()[1])
+
+    def test_parsing_import_does_not_import_pandas(self):
+        """
+        pandas is only imported when a dataframe is requested
+        """
+        code = "import sys, parsing; assert 'pandas' not in sys.modules"
+        repo_dir = Path(__file__).parents[1]
+        subprocess.run([sys.executable, "-c", code], cwd=repo_dir, check=True)
+
+    def test_parse_grit_html_lazy(self, mocker):
+        """
+        Lazy result decodes a column only on first access and converts to the same dataframe
+        """
+        result = parse_grit_html(self.single_entry_table_html_str, lazy=True)
+        assert isinstance(result, LazyGritResult)
+        assert len(result) == 1
+        assert result.columns == self.expected_column_names
+
+        handler = mocker.Mock(wraps=result._handlers["elevation_gain_ft"])
+        result._handlers["elevation_gain_ft"] = handler
+        assert result["elevation_gain_ft"] == [396.0]
+        assert result["elevation_gain_ft"] == [396.0]
+        assert handler.call_count == 1
+
+        pd.testing.assert_frame_equal(result.to_dataframe(), self.expected_df)
+
+    def test_parse_grit_html_lazy_error(self):
+        """
+        Unknown column name
+        """
+        result = parse_grit_html(self.single_entry_table_html_str, lazy=True)
+        with pytest.raises(KeyError):
+            result["unknown_column"]
+
+    def test_parse_grit_html_include_keys(self, tmp_path):
+        """
+        Key columns are appended by every parsing path
+        """
+        expected_df = self.expected_df.copy()
+        expected_df["race_id"] = 90618
+        expected_df["result_set_id"] = 459362
+        expected_df["participant_id"] = 89338374
+
+        df = parse_grit_html(self.single_entry_table_html_str, include_keys=True)
+        pd.testing.assert_frame_equal(df, expected_df)
+
+        result = parse_grit_html(self.single_entry_table_html_str, lazy=True, include_keys=True)
+        assert result["participant_id"] == [89338374]
+        pd.testing.assert_frame_equal(result.to_dataframe(), expected_df)
+
+        input_file_path = tmp_path / "results.html"
+        input_file_path.write_text(self.single_entry_table_html_str)
+        data = list(iter_grit_file_rows(input_file_path, include_keys=True))
+        assert data == [self.expected_row + [90618, 459362, 89338374]]
+        assert list(df.columns[-3:]) == KEY_COLUMNS
@@ -0,0 +1,175 @@
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+import pytest
+from conftest import SINGLE_ENTRY_TABLE_HTML
+
+from fast_scanner import scan_grit_rows
+from parsing import parse_grit_html
+from utils import first_names, last_names, obfuscate_html_table
+
+# number of rows in the generated input (about 8 MB of HTML)
+NUM_ROWS = 10_000
+
+# the throughput is the best of this many runs (the memory peak is measured in a separate run)
+NUM_TIMED_RUNS = 3
+
+ROW_TEMPLATE = (
+    '<tr data-result-url="/Race/Results/90618/IndividualResult/BkfK?resultSetId=459362#U{account}">'
+    '<td class="place">{place}</td><td class="bib">{bib}</td><td class="ta-left">'
+    '<div class="participantName">\n    <div class="participantName__image">\n'
+    '        <div class="rsuCircleImg rsuCircleImg--xs rsuCircleImg--firstChar">'
+    "<span>{initial}</span></div>\n    </div>\n"
+    '    <div class="participantName__name">\n'
+    '        <div class="participantName__name__firstName">{first_name}</div>\n'
+    '        <div class="participantName__name__lastName">{last_name}</div>\n    </div>\n'
+    "</div></td><td>{gender}</td><td>Golden</td><td>CO</td><td>US</td>"
+    '<td class="time">{clock_time}</td><td class="time"/><td>{distance}</td><td>{progress}</td>'
+    '<td>{elevation_ft:,}ft ({elevation_m:,.1f}m)</td><td class="time">{pace}</td><td>{age}</td>'
+    "<td>{age_percentage}</td>{run_crew}</tr>\n"
+)
+
+RUN_CREW_TEMPLATE = (
+    '<td><a href="/Race/Results/90618/TeamResults/TeamDetails-28511-673418" target="_blank">'
+    '{name} <i class="icon icon-external-link" aria-hidden="true"/></a></td>'
+)
+
+RUN_CREWS = ["Adventures for the Cure", "2Lowe", "Trail Ducks", "Mile High Milers"]
+
+
+def format_seconds(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours == 0:
+        return f"{minutes}:{seconds:02d}"
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def generate_grit_html(num_rows: int, seed: int = 42) -> str:
+    """
+    Generate a GRIT results table in the runsignup markup with random values
+
+    Args:
+        num_rows (int): number of rows
+        seed (int, optional): value to seed random number generator. Defaults to 42.
+
+    Returns:
+        str: HTML text
+    """
+    rng = random.Random(seed)
+    html_text = SINGLE_ENTRY_TABLE_HTML
+    head = html_text[: html_text.index("<tbody>") + len("<tbody>")] + "\n"
+    rows = []
+    for place in range(1, num_rows + 1):
+        first_name = rng.choice(first_names)
+        distance = round(rng.uniform(1, 500), 2)
+        pace_seconds = rng.randint(360, 1200)
+        elevation_ft = rng.randint(0, 150_000)
+        run_crew = (
+            RUN_CREW_TEMPLATE.format(name=rng.choice(RUN_CREWS))
+            if rng.random() < 0.5
+            else "<td></td>"
+        )
+        rows.append(
+            ROW_TEMPLATE.format(
+                account=rng.randint(10_000_000, 99_999_999),
+                place=place,
+                bib=place + 100,
+                initial=first_name[0],
+                first_name=first_name,
+                last_name=rng.choice(last_names),
+                gender=rng.choice("MF"),
+                clock_time=format_seconds(round(distance * pace_seconds)),
+                distance=distance,
+                progress=f"{distance / 4:.1f}%",
+                elevation_ft=elevation_ft,
+                elevation_m=elevation_ft * 0.3048,
+                pace=format_seconds(pace_seconds),
+                age=rng.randint(18, 80),
+                age_percentage=f"{rng.uniform(20, 100):.1f}",
+                run_crew=run_crew,
+            )
+        )
+    return head + "".join(rows) + "</tbody>\n</table>\n"
+
+
+def measure(func: Callable[[], object], num_rows: int) -> tuple[float, float]:
+    """
+    Measure the throughput and tracemalloc peak memory of a function
+
+    NOTE: tracemalloc only sees memory allocated by Python (not by libxml2 inside lxml).
+
+    Args:
+        func (Callable[[], object]): function that processes num_rows rows
+        num_rows (int): number of rows processed
+
+    Returns:
+        tuple[float, float]: rows per second (best of NUM_TIMED_RUNS), peak memory in MiB
+    """
+    gc.collect()
+    times = []
+    for _ in range(NUM_TIMED_RUNS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return num_rows / min(times), peak / 2**20
+
+
+@pytest.fixture(scope="module")
+def large_html_text() -> str:
+    return generate_grit_html(NUM_ROWS)
+
+
+class TestGeneratedInput:
+    """
+    Test that the generated input is valid (so that the perf tests measure the intended path)
+    """
+
+    def test_generate_grit_html(self):
+        """
+        Verify the generated rows parse the same with both engines without a fallback to lxml
+        """
+        html_text = generate_grit_html(100)
+        df = parse_grit_html(html_text)
+        assert len(df) == 100
+        assert df["run_crew_name"].notna().any()
+        pd.testing.assert_frame_equal(
+            df, pd.DataFrame(scan_grit_rows(html_text), columns=df.columns)
+        )
+
+
+@pytest.mark.perf
+class TestPerformanceBudgets:
+    """
+    Check throughput and peak memory against the budgets in perf_baseline.json (run with --run-perf)
+    """
+
+    @pytest.mark.parametrize("engine", ["lxml", "fast"])
+    def test_parse_grit_html(self, large_html_text, perf_report, engine):
+        """
+        Test parse_grit_html throughput and peak memory
+        """
+        rows_per_sec, peak_mib = measure(
+            lambda: parse_grit_html(large_html_text, engine=engine), NUM_ROWS
+        )
+        perf_report.check(f"parse_grit_html[{engine}]", rows_per_sec, peak_mib)
+
+    def test_obfuscate_html_table(self, large_html_text, perf_report):
+        """
+        Test obfuscate_html_table throughput and peak memory
+        """
+        rows_per_sec, peak_mib = measure(lambda: obfuscate_html_table(large_html_text), NUM_ROWS)
+        perf_report.check("obfuscate_html_table", rows_per_sec, peak_mib)
@@ -0,0 +1,121 @@
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from conftest import make_row
+
+from columnar_cache import ColumnarCache, ColumnarCacheWriter
+from parsing import REFORMATTED_HEADER
+from query_results import main, parse_age_range
+
+# queried columns of each row (the country of every runner is "US")
+ROW_COLUMNS = ["place", "bib", "name", "gender", "age", "state", "elevation_gain_ft", "pace"]
+ROW_VALUES = [
+    (1, 2533, "Matthew Perkett", "M", 36, "CO", 396.0, "8:02"),
+    (2, 1501, "Joan Benoit", "F", 45, "ME", 25000.0, "7:10"),
+    (3, 914, "Kara Goucher", "F", 41, "CO", 30000.0, None),
+    (4, 1948, "Des Linden", "F", 52, "MI", 27000.0, "7:30"),
+    (5, 77, "Molly Seidel", "F", 40, "WI", None, "6:55"),
+]
+
+
+class TestQueryResults:
+    """
+    Test the columnar cache and the query CLI
+    """
+
+    rows = [make_row(country="US", **dict(zip(ROW_COLUMNS, values))) for values in ROW_VALUES]
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path):
+        """
+        Helper to write a cache of the rows
+        """
+        writer = ColumnarCacheWriter(REFORMATTED_HEADER)
+        assert list(writer.add_rows(self.rows)) == self.rows
+        writer.save(tmp_path / "cache")
+        return tmp_path / "cache"
+
+    def run(self, capsys, argv):
+        main(argv)
+        return [line.split() for line in capsys.readouterr().out.splitlines()]
+
+    def test_columnar_cache(self, cache_dir):
+        """
+        Columns are read back with missing values and the derived pace column
+        """
+        cache = ColumnarCache(cache_dir)
+        assert len(cache) == 5
+        assert list(cache["bib"]) == [2533.0, 1501.0, 914.0, 1948.0, 77.0]
+        assert cache["name"][0] == "Matthew Perkett"
+        assert cache["city"] == [None] * 5
+        assert math.isnan(cache["elevation_gain_ft"][4])
+        assert cache["pace_seconds"][0] == 482.0
+        assert cache.format_value("place", 0) == "1"
+        assert cache.format_value("elevation_gain_ft", 0) == "396.0"
+        assert cache.format_value("elevation_gain_ft", 4) == ""
+        assert cache.format_value("city", 0) == ""
+
+    def test_columnar_cache_error(self, tmp_path):
+        """
+        Missing cache directory
+        """
+        with pytest.raises(ValueError) as e_info:
+            ColumnarCache(tmp_path / "missing")
+        assert e_info.value.args[0] == f"cache does not exist: {tmp_path / 'missing'}"
+
+    def test_top(self, capsys, cache_dir):
+        """
+        Top women 40-49 by elevation gain
+        """
+        argv = ["top", "-c", str(cache_dir), "--by", "elevation_gain_ft"]
+        lines = self.run(capsys, argv + ["--gender", "F", "--age", "40-49", "-n", "2"])
+        assert lines[0] == ["rank", "place", "name", "gender", "age", "state", "country"] + [
+            "elevation_gain_ft"
+        ]
+        assert lines[1] == ["1", "3", "Kara", "Goucher", "F", "41", "CO", "US", "30000.0"]
+        assert lines[2] == ["2", "2", "Joan", "Benoit", "F", "45", "ME", "US", "25000.0"]
+        assert len(lines) == 3
+
+    def test_rank(self, capsys, cache_dir):
+        """
+        Rank by pace (fastest first) skipping missing paces
+        """
+        argv = ["rank", "-c", str(cache_dir), "--by", "pace_seconds", "--ascending"]
+        lines = self.run(capsys, argv + ["--bib", "1948", "--columns", "bib", "pace"])
+        assert lines == [["rank", "3", "of", "4"], ["rank", "bib", "pace"], ["3", "1948", "7:30"]]
+
+    def test_find(self, capsys, cache_dir):
+        """
+        Find by part of a name
+        """
+        lines = self.run(capsys, ["find", "-c", str(cache_dir), "--name", "GOUCH"])
+        assert [line[:3] for line in lines] == [
+            ["place", "name", "gender"],
+            ["3", "Kara", "Goucher"],
+        ]
+
+    def test_filter(self, capsys, cache_dir):
+        """
+        Filter by state
+        """
+        argv = ["filter", "-c", str(cache_dir), "--state", "CO", "--columns", "place", "age"]
+        lines = self.run(capsys, argv)
+        assert lines == [["place", "age"], ["1", "36"], ["3", "41"]]
+
+    def test_parse_age_range(self):
+        """
+        Age ranges
+        """
+        assert parse_age_range("40-49") == (40, 49)
+        assert parse_age_range("40") == (40, 40)
+
+    def test_query_import_is_light(self):
+        """
+        The query CLI does not import the parsing dependencies or pandas
+        """
+        code = "import sys, query_results; assert not {'lxml', 'pandas'} & set(sys.modules)"
+        repo_dir = Path(__file__).parents[1]
+        subprocess.run([sys.executable, "-c", code], cwd=repo_dir, check=True)
@@ -0,0 +1,123 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_dataset import SharedDataset, attach_shared_dataset, detach_shared_dataset
+
+
+def sum_elevation(spec: dict, state: str) -> float:
+    view = attach_shared_dataset(spec)
+    return float(view["elevation_gain_ft"][view.equal_mask("state", state)].sum())
+
+
+class TestSharedDataset:
+    df = pd.DataFrame(
+        {
+            "place": [1, 2, 3, 4],
+            "name": ["A B", "C D", "José F", "G H"],
+            "state": ["CO", None, "CO", "UT"],
+            "elevation_gain_ft": [1000.0, 250.5, 3000.0, np.nan],
+            "age": [40.0, np.nan, 30.0, 50.0],
+        }
+    )
+
+    def test_round_trip(self):
+        """
+        Test that an attached view matches the published dataframe
+        """
+        with SharedDataset.publish(self.df) as dataset:
+            view = attach_shared_dataset(dataset.spec)
+            assert len(view) == 4
+            assert view.columns == list(self.df.columns)
+            assert view.categories("state") == ["CO", "UT"]
+            assert view.categories("name") == ["A B", "C D", "José F", "G H"]
+            assert view.codes("state").tolist() == [0, -1, 0, 1]
+            np.testing.assert_array_equal(view["place"], self.df["place"].to_numpy())
+            # categories are in order of first appearance
+            expected = self.df.assign(
+                name=pd.Categorical(self.df["name"], categories=view.categories("name")),
+                state=pd.Categorical(self.df["state"], categories=["CO", "UT"]),
+            )
+            pd.testing.assert_frame_equal(view.to_dataframe(), expected)
+            assert view.equal_mask("state", "CO").tolist() == [True, False, True, False]
+            assert view.equal_mask("state", "WY").tolist() == [False] * 4
+            with pytest.raises(ValueError):
+                view.codes("place")
+            with pytest.raises(ValueError):
+                view.categories("place")
+
+            # the view is cached per process and read-only
+            assert attach_shared_dataset(dataset.spec) is view
+            assert not view["elevation_gain_ft"].flags.writeable
+
+    def test_zero_copy(self):
+        """
+        Test that numeric columns and codes are not copied
+        """
+        with SharedDataset.publish(self.df) as dataset:
+            view = attach_shared_dataset(dataset.spec)
+            block = np.frombuffer(view._shm.buf, dtype=np.uint8)
+            df = view.to_dataframe()
+            for column_name in ("place", "elevation_gain_ft", "age"):
+                assert np.shares_memory(df[column_name].to_numpy(), view[column_name])
+                assert np.shares_memory(view[column_name], block)
+            assert np.shares_memory(view.codes("state"), block)
+            del block, df
+            detach_shared_dataset(dataset.spec)
+
+    def test_spec_size(self):
+        """
+        Test that the distinct values are stored in the block instead of the spec
+        """
+        df = pd.DataFrame({"name": [f"Runner {i}" for i in range(10_000)], "state": None})
+        with SharedDataset.publish(df) as dataset:
+            assert len(pickle.dumps(dataset.spec)) < 500
+            view = attach_shared_dataset(dataset.spec)
+            assert view.categories("name") == df["name"].tolist()
+            assert view.codes("name").tolist() == list(range(10_000))
+            assert view.categories("state") == []
+            detach_shared_dataset(dataset.spec)
+
+    def test_publish_error(self):
+        """
+        Test that columns that are neither numeric nor text are rejected
+        """
+        df = pd.DataFrame({"date": pd.to_datetime(["2024-08-01"])})
+        with pytest.raises(ValueError) as e_info:
+            SharedDataset.publish(df)
+        assert e_info.value.args[0].startswith("column 'date' must be numeric or text")
+
+    def test_detach(self):
+        """
+        Test that views are not accumulated across datasets and can be detached
+        """
+        with SharedDataset.publish(self.df) as dataset_01:
+            view_01 = attach_shared_dataset(dataset_01.spec)
+            with SharedDataset.publish(self.df) as dataset_02:
+                # attaching to another dataset drops the cached view of the previous one
+                view_02 = attach_shared_dataset(dataset_02.spec)
+                assert attach_shared_dataset(dataset_01.spec) is not view_01
+                assert attach_shared_dataset(dataset_02.spec) is not view_02
+
+                view = attach_shared_dataset(dataset_02.spec)
+                detach_shared_dataset(dataset_02.spec)
+                assert view._shm is None
+                assert attach_shared_dataset(dataset_02.spec) is not view
+                detach_shared_dataset(dataset_02.spec)
+            del view_01, view_02
+
+    def test_workers(self):
+        """
+        Test that worker processes can attach to the published dataset
+        """
+        states = ["CO", "UT", "WY"]
+        with SharedDataset.publish(self.df) as dataset:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(sum_elevation, repeat(dataset.spec), states))
+        assert results[0] == 4000.0
+        assert np.isnan(results[1])
+        assert results[2] == 0.0
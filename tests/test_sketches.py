@@ -0,0 +1,190 @@
+import random
+
+import pytest
+from conftest import make_row
+
+from sketches import (
+    FixedBinHistogram,
+    QuantileSketch,
+    ResultsSketch,
+    get_sketch_file_path,
+    merge_sketch_files,
+)
+
+
+class TestQuantileSketch:
+    """
+    Test the mergeable quantile sketch
+    """
+
+    random.seed(42)
+    values = [random.lognormvariate(7, 1.5) for _ in range(5000)] + [0.0] * 50
+
+    @staticmethod
+    def exact_quantile(values, q):
+        """
+        Linear interpolation quantile (as used by pandas)
+        """
+        values = sorted(values)
+        rank = q * (len(values) - 1)
+        lo = int(rank)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+    def test_quantile_relative_accuracy(self):
+        """
+        Quantile estimates are within the relative accuracy (plus interpolation slack)
+        """
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in self.values:
+            sketch.add(value)
+
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+            expected = self.exact_quantile(self.values, q)
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.03)
+        assert sketch.quantile(0.0) == min(self.values)
+        assert sketch.quantile(1.0) == max(self.values)
+        assert sketch.quantile(0.001) == 0.0
+
+    def test_merge(self):
+        """
+        Merging partial sketches gives the same result as a single sketch over all values
+        """
+        full = QuantileSketch()
+        left = QuantileSketch()
+        right = QuantileSketch()
+        for i, value in enumerate(self.values):
+            full.add(value)
+            (left if i % 3 else right).add(value)
+        left.merge(right)
+
+        assert left.buckets == full.buckets
+        assert left.zero_count == full.zero_count
+        assert left.count == full.count
+        assert left.mean == pytest.approx(full.mean)
+        assert left.std() == pytest.approx(full.std())
+        assert left.quantile(0.5) == full.quantile(0.5)
+
+    def test_round_trip(self):
+        """
+        Sketch is unchanged after converting to and from a dict
+        """
+        sketch = QuantileSketch()
+        for value in self.values[:100]:
+            sketch.add(value)
+        new_sketch = QuantileSketch.from_dict(sketch.to_dict())
+        assert new_sketch.to_dict() == sketch.to_dict()
+
+    def test_merge_error(self):
+        """
+        Sketches with different relative accuracy cannot be merged
+        """
+        with pytest.raises(ValueError) as e_info:
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+        expected_msg = "Cannot merge sketches with different relative_accuracy"
+        assert e_info.value.args[0] == expected_msg
+
+    def test_add_error(self):
+        """
+        Negative values are not supported
+        """
+        with pytest.raises(ValueError) as e_info:
+            QuantileSketch().add(-1.0)
+        assert e_info.value.args[0] == "value (-1.0) must be non-negative"
+
+
+class TestFixedBinHistogram:
+    """
+    Test fixed-bin histograms
+    """
+
+    def test_add_and_merge(self):
+        """
+        Values are counted in the correct bins and histograms merge by adding counts
+        """
+        histogram = FixedBinHistogram(0.0, 10.0, 3)
+        for value in (-1.0, 0.0, 9.99, 10.0, 29.9, 30.0):
+            histogram.add(value)
+        assert histogram.counts == [2, 1, 1]
+        assert (histogram.underflow, histogram.overflow) == (1, 1)
+        assert histogram.edges == [0.0, 10.0, 20.0, 30.0]
+
+        other = FixedBinHistogram.from_dict(histogram.to_dict())
+        histogram.merge(other)
+        assert histogram.counts == [4, 2, 2]
+        assert (histogram.underflow, histogram.overflow) == (2, 2)
+
+        # a count of -1 removes a value
+        for value in (-1.0, 0.0, 30.0):
+            histogram.add(value, -1)
+        assert histogram.counts == [3, 2, 2]
+        assert (histogram.underflow, histogram.overflow) == (1, 1)
+
+    def test_merge_error(self):
+        """
+        Histograms with different bins cannot be merged
+        """
+        with pytest.raises(ValueError) as e_info:
+            FixedBinHistogram(0.0, 10.0, 3).merge(FixedBinHistogram(0.0, 5.0, 3))
+        assert e_info.value.args[0] == "Cannot merge histograms with different bins"
+
+
+class TestResultsSketch:
+    """
+    Test sketches of parsed rows
+    """
+
+    rows_01 = [
+        make_row(elevation_gain_ft=396.0, distance_miles=259.06, age=36, pace="8:02"),
+        make_row(elevation_gain_ft=25000.0, distance_miles=417.0, age=73, pace="5:42"),
+    ]
+    rows_02 = [
+        make_row(elevation_gain_ft=1967.0, age=41),
+        make_row(elevation_gain_ft=0.0, distance_miles=0.1, age=6, pace="1:02:03"),
+    ]
+
+    def test_add_rows(self):
+        """
+        Rows pass through unchanged and missing values are counted
+        """
+        sketch = ResultsSketch()
+        rows = list(sketch.add_rows(self.rows_02))
+        assert rows == self.rows_02
+        assert sketch.num_rows == 2
+        assert sketch.columns["distance_miles"].missing == 1
+        assert sketch.columns["pace_min_per_mile"].missing == 1
+        assert sketch.columns["pace_min_per_mile"].quantiles.max == 62.05
+
+        summary = sketch.describe()
+        assert summary["age"]["count"] == 2.0
+        assert summary["age"]["mean"] == 23.5
+        assert summary["age"]["min"] == 6
+        assert summary["age"]["max"] == 41
+
+    def test_merge_sketch_files(self, tmp_path):
+        """
+        Merging saved per-file sketches matches a single sketch over all rows
+        """
+        for name, rows in (("a", self.rows_01), ("b", self.rows_02)):
+            sketch = ResultsSketch()
+            list(sketch.add_rows(rows))
+            sketch.save(get_sketch_file_path(tmp_path / f"{name}.csv"))
+
+        merged = merge_sketch_files([tmp_path / "a.sketch.json", tmp_path / "b.sketch.json"])
+        expected = ResultsSketch()
+        list(expected.add_rows(self.rows_01 + self.rows_02))
+
+        assert merged.num_rows == 4
+        for column_name, column_sketch in expected.columns.items():
+            merged_column_sketch = merged.columns[column_name]
+            assert merged_column_sketch.histogram.counts == column_sketch.histogram.counts
+            assert merged_column_sketch.quantiles.buckets == column_sketch.quantiles.buckets
+            assert merged_column_sketch.missing == column_sketch.missing
+        assert merged.describe()["elevation_gain_ft"]["max"] == 25000.0
+
+    def test_get_sketch_file_path(self):
+        """
+        Sketch is saved next to the output file
+        """
+        path = get_sketch_file_path("output/example-results-01.csv")
+        assert str(path) == "output/example-results-01.sketch.json"
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snapshots import frame_from_state, frame_to_state, get_changed_keys, index_by_bib
+
+
+class TestSnapshots:
+    """
+    Test the helpers shared by the incrementally refreshed features
+    """
+
+    old = pd.DataFrame(
+        {"state": ["CO", None, "UT", "CO"], "elevation_gain_ft": [100.0, np.nan, 300.0, 400.0]},
+        index=pd.Index([1, 2, 3, 4], name="bib"),
+    )
+
+    # bib 2 is unchanged (missing values are equal), bib 3 changed, bib 4 left and bib 5 is new
+    new = pd.DataFrame(
+        {"state": ["CO", None, "UT", "WY"], "elevation_gain_ft": [100.0, np.nan, 350.0, 0.0]},
+        index=pd.Index([1, 2, 3, 5], name="bib"),
+    )
+
+    def test_index_by_bib(self):
+        """
+        Columns are indexed by bib and duplicate bibs are rejected
+        """
+        df = self.old.reset_index()
+        pd.testing.assert_frame_equal(index_by_bib(df, ["state"]), self.old[["state"]])
+        with pytest.raises(ValueError) as e_info:
+            index_by_bib(pd.concat([df, df]), ["state"])
+        assert e_info.value.args[0] == "Expected each bib to appear once"
+
+    def test_get_changed_keys(self):
+        """
+        Added, removed and changed keys are returned
+        """
+        assert get_changed_keys(self.old, self.new).tolist() == [3, 4, 5]
+        assert get_changed_keys(self.old, self.new, ["state"]).tolist() == [4, 5]
+        assert get_changed_keys(self.old, self.old).tolist() == []
+
+    def test_frame_state_round_trip(self):
+        """
+        Frames are unchanged after a JSON round trip (missing values are saved as null)
+        """
+        state = json.loads(json.dumps(frame_to_state(self.old)))
+        assert state["columns"] == ["bib", "state", "elevation_gain_ft"]
+        assert state["data"][1] == [2, None, None]
+        df = frame_from_state(state).astype({"elevation_gain_ft": float})
+        pd.testing.assert_frame_equal(df, self.old, check_dtype=False)
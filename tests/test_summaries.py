@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from summaries import ResultsSummary, get_summary_file_path
+
+
+class TestResultsSummary:
+    """
+    Test the notebook summaries maintained from snapshot deltas
+    """
+
+    df_01 = pd.DataFrame(
+        {
+            "place": [1, 2, 3, 4, 5],
+            "bib": [1, 2, 3, 4, 5],
+            "name": ["A B", "C D", "E F", "G H", "I J"],
+            "gender": ["F", "M", "F", "M", None],
+            "state": ["CO", "CO", "MD", None, "BC"],
+            "country": ["US", "US", "US", "US", "CA"],
+            "distance_miles": [500.0, 400.0, 300.0, 200.0, np.nan],
+            "elevation_gain_ft": [1000.0, 5000.0, 3000.0, 5000.0, np.nan],
+            "age": [40, 50, 30, 20, 60],
+        }
+    )
+
+    # bib 2 climbed more, bib 4 moved to MD, bib 5 left, bib 6 is new (places shift)
+    df_02 = pd.DataFrame(
+        {
+            "place": [1, 2, 3, 4, 5],
+            "bib": [6, 1, 2, 3, 4],
+            "name": ["K L", "A B", "C D", "E F", "G H"],
+            "gender": ["F", "F", "M", "F", "M"],
+            "state": [None, "CO", "CO", "MD", "MD"],
+            "country": ["GB", "US", "US", "US", "US"],
+            "distance_miles": [600.0, 500.0, 450.0, 300.0, 200.0],
+            "elevation_gain_ft": [0.0, 1000.0, 9000.0, 3000.0, 5000.0],
+            "age": [35, 40, 50, 30, 20],
+        }
+    )
+
+    def assert_summaries_equal(self, summary, expected):
+        """
+        Helper to compare every summary of two ResultsSummary objects
+        """
+        for method_name in ("country_table", "state_table", "gender_table", "elevation_ranking"):
+            pd.testing.assert_frame_equal(
+                getattr(summary, method_name)(), getattr(expected, method_name)()
+            )
+        for column_name, histogram in summary.histograms.items():
+            assert histogram.to_dict() == expected.histograms[column_name].to_dict()
+
+    def test_from_snapshot(self):
+        """
+        Summaries match the notebook (fractions are of all runners, states are US only)
+        """
+        summary = ResultsSummary.from_snapshot(self.df_01)
+        expected = pd.DataFrame(
+            {"state": ["CO", "MD", None], "count": [2, 1, 1], "fraction": [0.4, 0.2, 0.2]}
+        )
+        pd.testing.assert_frame_equal(summary.state_table(), expected)
+        gender_table = summary.gender_table()
+        assert gender_table["gender"].tolist()[:2] == ["F", "M"]
+        assert gender_table["gender"].isna().tolist() == [False, False, True]
+        assert summary.country_table()["count"].tolist() == [4, 1]
+
+        # ties are broken by bib and runners without an elevation gain are not ranked
+        ranking = summary.elevation_ranking()
+        assert ranking["bib"].tolist() == [2, 4, 3, 1]
+        assert ranking["elevation_place"].tolist() == [1, 2, 3, 4]
+        assert summary.elevation_ranking(2)["bib"].tolist() == [2, 4]
+
+        assert summary.histograms["elevation_gain_ft"].counts[:6] == [0, 1, 0, 1, 0, 2]
+
+    def test_update(self):
+        """
+        Incremental update only re-counts changed runners and matches a full recompute
+        """
+        summary = ResultsSummary.from_snapshot(self.df_01)
+        assert summary.update(self.df_02) == 4
+        self.assert_summaries_equal(summary, ResultsSummary.from_snapshot(self.df_02))
+
+        # place changes alone do not require re-counting
+        df_03 = self.df_02.copy()
+        df_03["place"] = df_03["place"][::-1].to_numpy()
+        assert summary.update(df_03) == 0
+        self.assert_summaries_equal(summary, ResultsSummary.from_snapshot(df_03))
+
+    def test_save_and_load(self, tmp_path):
+        """
+        Summaries are unchanged after saving and loading
+        """
+        summary = ResultsSummary.from_snapshot(self.df_01)
+        file_path = get_summary_file_path(tmp_path / "results-01.csv")
+        assert file_path.name == "results-01.summary.json"
+        summary.save(file_path)
+        loaded = ResultsSummary.load(file_path)
+        self.assert_summaries_equal(loaded, summary)
+
+        # the sorted ranking is saved, so loading does not sort it again
+        assert loaded.ranking == summary.ranking
+        assert all(isinstance(key, tuple) for key in loaded.ranking)
+
+        loaded.update(self.df_02)
+        self.assert_summaries_equal(loaded, ResultsSummary.from_snapshot(self.df_02))
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import SINGLE_ENTRY_TABLE_HTML
+
+from parsing import DEFECT_COLUMNS, iter_grit_file_rows, parse_grit_html
+from validation import (
+    check_pace_consistency,
+    time_text_to_seconds_vectorized,
+    validate_grit_html,
+)
+
+
+class TestLenientParsing:
+    """
+    Test that bad values are collected as defects instead of raising
+    """
+
+    html_text = SINGLE_ENTRY_TABLE_HTML
+
+    # bad elevation gain and age in the first row, then a row missing a cell with a bad result URL
+    row_html = html_text[html_text.index("<tr data-result-url") : html_text.index("</tbody>")]
+    bad_html_text = html_text.replace(
+        "</tbody>",
+        row_html.replace("<td>M</td>", "").replace("resultSetId=459362", "resultSetId=x")
+        + "</tbody>",
+    )
+    bad_html_text = bad_html_text.replace("396ft (120.7m)", "396ft", 1).replace(
+        "<td>36</td>", "<td>thirty-six</td>", 1
+    )
+
+    def test_parse_grit_html_defects(self):
+        """
+        Test that bad values are None and recorded with their row, column, raw text and reason
+        """
+        with pytest.raises(ValueError):
+            parse_grit_html(self.bad_html_text)
+
+        for engine in ("lxml", "fast"):
+            defects = []
+            df = parse_grit_html(
+                self.bad_html_text, include_keys=True, engine=engine, defects=defects
+            )
+            assert len(df) == 2
+            assert pd.isna(df.loc[0, "elevation_gain_ft"])
+            assert pd.isna(df.loc[0, "age"])
+            assert df.loc[0, "name"] == "Matthew Perkett"
+            assert df.loc[1].drop(["race_id", "result_set_id", "participant_id"]).isna().all()
+            assert [defect[:3] for defect in defects] == [
+                (0, "elevation_gain_ft", "396ft"),
+                (0, "age", "thirty-six"),
+                (1, None, defects[2][2]),
+                (1, "data-result-url", defects[3][2]),
+            ]
+            assert "Expected the row to have the same length" in defects[2][3]
+            assert defects[3][2].endswith("resultSetId=x#U89338374")
+
+    def test_parse_grit_html_no_defects(self):
+        """
+        Test that lenient parsing of a valid table gives the same data and no defects
+        """
+        defects = []
+        df = parse_grit_html(self.html_text, defects=defects)
+        assert defects == []
+        pd.testing.assert_frame_equal(df, parse_grit_html(self.html_text))
+
+        with pytest.raises(ValueError):
+            parse_grit_html(self.html_text, lazy=True, defects=defects)
+
+    def test_iter_grit_file_rows_defects(self, tmp_path):
+        """
+        Test that the streaming parser collects the same defects
+        """
+        input_file_path = tmp_path / "input.html"
+        input_file_path.write_text(self.bad_html_text)
+        defects = []
+        rows = list(iter_grit_file_rows(input_file_path, include_keys=True, defects=defects))
+        expected_defects = []
+        parse_grit_html(self.bad_html_text, include_keys=True, defects=expected_defects)
+        assert len(rows) == 2
+        assert defects == expected_defects
+
+
+class TestPaceConsistency:
+    """
+    Test the vectorized pace / clock_time / distance_miles consistency pass
+    """
+
+    df = pd.DataFrame(
+        {
+            "clock_time": ["34:42:29", "NONE", "34:42:29", "34:42:29", "34:42", "1:2:3:4", None],
+            "distance_miles": [259.06, 100.0, 259.06, 259.06, 10.0, 10.0, 10.0],
+            "pace": ["8:02", None, "9:00", None, "3:28", "8:00", "8:o0"],
+        }
+    )
+
+    def test_time_text_to_seconds_vectorized(self):
+        """
+        Test converting time text to seconds
+        """
+        seconds = time_text_to_seconds_vectorized(self.df["clock_time"])
+        assert seconds.tolist()[:5:2] == [124949.0, 124949.0, 2082.0]
+        assert seconds.isna().tolist() == [False, True, False, False, False, True, True]
+
+    def test_check_pace_consistency(self):
+        """
+        Test that inconsistent rows are flagged (a clock time of "NONE" is not a defect)
+        """
+        defects = check_pace_consistency(self.df)
+        assert sorted(defects) == [
+            (2, "pace", "9:00", "pace does not match clock_time / distance_miles (8:02)"),
+            (3, "pace", None, "pace is missing (clock_time / distance_miles is 8:02)"),
+            (5, "clock_time", "1:2:3:4", "time text is not formatted as expected"),
+            (6, "pace", "8:o0", "time text is not formatted as expected"),
+        ]
+
+    def test_validate_grit_html(self):
+        """
+        Test that a single pass gives the data and the defect table
+        """
+        html_text = TestLenientParsing.bad_html_text.replace(
+            '<td class="time">8:02</td>', '<td class="time">9:02</td>', 1
+        )
+        df, defects = validate_grit_html(html_text)
+        assert len(df) == 2
+        assert list(defects.columns) == DEFECT_COLUMNS
+        assert defects["row"].tolist() == [0, 0, 0, 1]
+        assert defects["column"].tolist()[:3] == ["elevation_gain_ft", "age", "pace"]
+        assert np.isnan(df.loc[1, "distance_miles"])
@@ -0,0 +1,145 @@
+"""
+Lenient validation of GRIT results: collect every defect in a single pass instead of raising on the
+first bad value.
+
+Bad values are recorded in a side table (one row per defect with DEFECT_COLUMNS) and are missing in
+the parsed data.  A vectorized consistency pass then flags rows whose pace does not match
+clock_time / distance_miles.
+"""
+
+import numpy as np
+import pandas as pd
+
+from parsing import DEFECT_COLUMNS, parse_grit_html
+
+# clock time shown for runners that did not record one (not a defect)
+MISSING_CLOCK_TIME = "NONE"
+
+# pace is shown rounded to the second, so allow this much difference from clock_time / distance
+PACE_TOLERANCE_SECONDS = 1.0
+
+
+def time_text_to_seconds_vectorized(s: pd.Series) -> pd.Series:
+    """
+    Convert clock time or pace text to seconds (see parsing.time_text_to_seconds)
+
+    Args:
+        s (pd.Series): time text formatted as "M:SS" or "H:MM:SS" (missing values allowed)
+
+    Returns:
+        pd.Series: seconds (NaN if missing or not formatted as expected)
+    """
+    parts = s.astype("string").str.extract(r"^(?:(\d+):)?(\d+):(\d+)$").astype(float)
+    return (parts[0].fillna(0) * 60 + parts[1]) * 60 + parts[2]
+
+
+def format_seconds(seconds: float) -> str:
+    """
+    Format a number of seconds as pace text (e.g. 489.4 -> "8:09")
+
+    Args:
+        seconds (float): seconds
+
+    Returns:
+        str: time text formatted as "M:SS"
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def check_pace_consistency(
+    df: pd.DataFrame, tolerance: float = PACE_TOLERANCE_SECONDS
+) -> list[tuple]:
+    """
+    Flag rows whose pace, clock_time and distance_miles disagree
+
+    A clock_time of MISSING_CLOCK_TIME is treated as missing.  Defects are found for:
+        - clock_time or pace text that is not formatted as expected
+        - a missing pace when clock_time and distance_miles are given
+        - a pace that differs from clock_time / distance_miles by more than the tolerance
+
+    Args:
+        df (pd.DataFrame): parsed results with clock_time, distance_miles and pace columns
+        tolerance (float, optional): allowed pace difference in seconds. Defaults to
+            PACE_TOLERANCE_SECONDS.
+
+    Returns:
+        list[tuple]: defects as (row, column, raw_text, reason) tuples (row is the position in df)
+    """
+    clock_text = df["clock_time"].where(df["clock_time"] != MISSING_CLOCK_TIME)
+    pace_text = df["pace"]
+    clock = time_text_to_seconds_vectorized(clock_text).to_numpy()
+    pace = time_text_to_seconds_vectorized(pace_text).to_numpy()
+    distance = pd.to_numeric(df["distance_miles"], errors="coerce").to_numpy(dtype=float)
+
+    bad_clock = clock_text.notna().to_numpy() & np.isnan(clock)
+    bad_pace = pace_text.notna().to_numpy() & np.isnan(pace)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected_pace = np.where(distance > 0, clock / distance, np.nan)
+    missing_pace = pace_text.isna().to_numpy() & ~np.isnan(expected_pace)
+    mismatched_pace = np.abs(expected_pace - pace) > tolerance
+
+    defects = []
+    for pos in np.flatnonzero(bad_clock):
+        text = clock_text.iat[pos]
+        defects.append((pos, "clock_time", text, "time text is not formatted as expected"))
+    for pos in np.flatnonzero(bad_pace):
+        text = pace_text.iat[pos]
+        defects.append((pos, "pace", text, "time text is not formatted as expected"))
+    for pos in np.flatnonzero(missing_pace):
+        expected = format_seconds(expected_pace[pos])
+        defects.append(
+            (pos, "pace", None, f"pace is missing (clock_time / distance_miles is {expected})")
+        )
+    for pos in np.flatnonzero(mismatched_pace):
+        expected = format_seconds(expected_pace[pos])
+        defects.append(
+            (
+                pos,
+                "pace",
+                pace_text.iat[pos],
+                f"pace does not match clock_time / distance_miles ({expected})",
+            )
+        )
+
+    return [(int(pos), column, text, reason) for pos, column, text, reason in defects]
+
+
+def defects_to_dataframe(defects: list[tuple]) -> pd.DataFrame:
+    """
+    Build the defect table sorted by row
+
+    Args:
+        defects (list[tuple]): (row, column, raw_text, reason) tuples
+
+    Returns:
+        pd.DataFrame: defects with DEFECT_COLUMNS
+    """
+    df = pd.DataFrame(defects, columns=DEFECT_COLUMNS)
+    return df.sort_values("row", kind="stable", ignore_index=True)
+
+
+def validate_grit_html(
+    html_text: str, include_keys: bool = False, engine: str = "lxml"
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Parse the GRIT HTML text leniently, returning the data and a full defect report
+
+    Only a missing table or an unexpected header raise; every other bad value is recorded and is
+    missing in the data.
+
+    Args:
+        html_text (str): input HTML text to parse
+        include_keys (bool, optional): add KEY_COLUMNS (see parse_grit_html). Defaults to False.
+        engine (str, optional): one of ENGINES. Defaults to "lxml".
+
+    Raises:
+        ValueError: header does not match what was expected (maybe format has changed?)
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: df, defects (with DEFECT_COLUMNS)
+    """
+    defects = []
+    df = parse_grit_html(html_text, include_keys=include_keys, engine=engine, defects=defects)
+    defects.extend(check_pace_consistency(df))
+    return df, defects_to_dataframe(defects)